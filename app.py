@@ -1,9 +1,12 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-import duckdb
+import logging
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from supply_chain.profiling import Profiler, activate, deactivate, section
+from supply_chain.snapshot import read_snapshot
 
 # Set page configuration
 st.set_page_config(
@@ -56,14 +59,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Caching the function to load the dataset
-@st.cache_data
-def load_data(file_path):
-    return pd.read_csv(file_path)
+# Optional profiling of this run: section timings, DuckDB queries and figure builds are
+# shown in a debug panel at the bottom of the page and logged as JSON lines
+profiling_logger = logging.getLogger('supply_chain.profiling')
+if not profiling_logger.handlers:
+    profiling_logger.addHandler(logging.StreamHandler())
+    profiling_logger.setLevel(logging.INFO)
 
-# Loading the data
-with st.spinner('Loading data...'):
-    df = load_data('supply_chain_data.csv')
+debug = st.sidebar.checkbox("🛠 Profiling panel", key="debug")
+explain = debug and st.sidebar.checkbox("Capture EXPLAIN ANALYZE", key="debug_explain")
+profiler = Profiler(explain=explain) if debug else None
+profiler_token = activate(profiler)
 
 # Dashboard header with animation
 st.markdown(
@@ -86,9 +92,225 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Dataset exploration option
-with st.expander("📋 Explore Dataset"):
-    st.write(df)
+# First paint: KPI cards from the snapshot written at ingest time, shown until the full
+# dashboard is ready, so a cold start renders before any heavy module is imported
+snapshot_placeholder = st.empty()
+snapshot = read_snapshot('supply_chain_data.csv')
+if snapshot is not None:
+    with snapshot_placeholder.container():
+        snapshot_cols = st.columns(5)
+        snapshot_totals = snapshot['totals']
+        snapshot_cols[0].metric("Total Revenue", f"${snapshot_totals['Revenue generated']:,.2f}")
+        snapshot_cols[1].metric("Total Orders", f"{snapshot_totals['Order quantities']:,.0f}")
+        snapshot_cols[2].metric("Total Availability", f"{snapshot_totals['Availability']:,.0f}")
+        snapshot_cols[3].metric("Total Stock Levels", f"{snapshot_totals['Stock levels']:,.0f}")
+        snapshot_cols[4].metric("Total Lead Times", f"{snapshot_totals['Lead times']:,.0f}")
+        st.caption("Refreshing…" if snapshot['stale'] else "Loading the full dashboard…")
+
+# Heavy modules (pandas, DuckDB, Plotly) are imported only after the first paint. Modules
+# used by a single section (SciPy for the optimizer, joblib and scikit-learn for the
+# what-if model, ...) are imported when that section is first rendered, so the default
+# section never pays for them
+from supply_chain import figures
+from supply_chain.aggregations import TOTAL, compute_aggregates, finalize
+from supply_chain.approximate import estimate_totals
+from supply_chain.database import TABLE, connect
+from supply_chain.filters import FILTER_COLUMNS, filter_options, normalize, where_clause
+from supply_chain.figures import cached_figure
+from supply_chain.incremental import read_sample, refresh, sample_path
+from supply_chain.schema import COLUMNS
+from supply_chain.publish import published_aggregates, published_filter_options, read_published
+from supply_chain.store import SharedStore
+
+# Files above this size are aggregated chunk by chunk and queried in place instead of being loaded whole
+STREAMING_THRESHOLD_BYTES = 2 * 1024 ** 3
+
+
+def use_streaming(file_path):
+    return os.environ.get('SUPPLY_CHAIN_STREAMING') == '1' or os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
+
+def file_version(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+# One DuckDB connection per data version shared across all sessions. Only the two latest
+# versions are kept, so sessions still reading the previous one can finish; older
+# connections are closed to release their copy of the data.
+@st.cache_resource
+def get_connections():
+    return SharedStore(max_entries=2, on_evict=lambda con: con.close(), lru=False)
+
+def get_connection(file_path, version):
+    return get_connections().get_or_compute(
+        (file_path, version), lambda: connect(file_path, materialize=not use_streaming(file_path)))
+
+# One store per server process shared by every session: each result is computed once,
+# even when several sessions ask for it at the same time, and is handed out by reference
+# rather than copied per session, within a fixed memory budget
+@st.cache_resource
+def get_store():
+    return SharedStore()
+
+# One pool of worker processes per server process for the simulation and forecast fits,
+# started once instead of on every slider change; workers are spawned, since forking the
+# threaded server could copy locks held by other sessions
+@st.cache_resource
+def get_pool():
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+
+# Results published by precompute_worker.py, if it is running; they are read as they are,
+# even while the worker is refreshing them, so no session waits on the recomputation
+def load_published(file_path):
+    return read_published(file_path)
+
+# Every chart's aggregates; when the file changes, only the newly appended rows are folded in
+def load_aggregates(file_path, version, published=None):
+    if published is not None:
+        return get_store().get_or_compute(
+            ('published_aggregates', file_path, published['version']), lambda: published_aggregates(published))
+    return get_store().get_or_compute(
+        ('aggregates', file_path, version), lambda: finalize(refresh(file_path, materialize=not use_streaming(file_path))))
+
+# Aggregates per filter combination; the filters are pushed down into one
+# parameterized query that covers every chart group
+def load_filtered_aggregates(file_path, version, filters):
+    def compute():
+        where, params = where_clause(filters)
+        return compute_aggregates(TABLE, get_connection(file_path, version), where, params)
+    return get_store().get_or_compute(('filtered_aggregates', file_path, version, filters), compute)
+
+def load_filter_options(file_path, version, published=None):
+    if published is not None:
+        return get_store().get_or_compute(
+            ('published_filter_options', file_path, published['version']), lambda: published_filter_options(published))
+    return get_store().get_or_compute(
+        ('filter_options', file_path, version), lambda: filter_options(load_aggregates(file_path, version)))
+
+# Building the drill-down cube once per data version and sharing it read-only across sessions;
+# a cube saved by an earlier server process for the same version is read back instead
+@st.cache_resource(max_entries=2)
+def load_cube(file_path, version, published=None):
+    from supply_chain.cube import cached_cube
+    from supply_chain.publish import published_cube
+
+    if published is not None:
+        return published_cube(published)
+    return cached_cube(file_path, version, lambda: get_connection(file_path, version))
+
+# Fast-preview estimates per filter combination, from the row sample kept by the last
+# refresh; None until there is one
+def load_estimates(file_path, filters):
+    path = sample_path(file_path)
+    if not path.exists():
+        return None
+    def compute():
+        where, params = where_clause(filters)
+        return estimate_totals(*read_sample(file_path), where, params)
+    return get_store().get_or_compute(('estimates', file_path, os.stat(path).st_mtime_ns, filters), compute)
+
+# Observed shipping lanes per filter combination, for the lane optimizer
+def load_lanes(file_path, version, filters):
+    from supply_chain.optimization import lane_table
+
+    def compute():
+        where, params = where_clause(filters)
+        return lane_table(get_connection(file_path, version), where, params)
+    return get_store().get_or_compute(('lanes', file_path, version, filters), compute)
+
+# Stock-out simulation per filter combination and scenario settings
+def load_simulation(file_path, version, filters, scenarios, service_level):
+    from supply_chain.simulation import load_inputs, simulate
+
+    def compute():
+        where, params = where_clause(filters)
+        inputs = load_inputs(get_connection(file_path, version), where, params)
+        return simulate(inputs, scenarios, service_level, pool=get_pool())
+    return get_store().get_or_compute(('simulation', file_path, version, filters, scenarios, service_level), compute)
+
+# Demand forecasts per filter combination, kept in memory; parameters stored by
+# forecast_demand.py are reused, and only that script writes them
+def load_forecast(file_path, version, filters):
+    from supply_chain.forecasting import forecast, load_series, params_path
+
+    def compute():
+        where, params = where_clause(filters)
+        series = load_series(get_connection(file_path, version), where=where, params=params)
+        return forecast(series, params_path(file_path), save=False, pool=get_pool())[0]
+    return get_store().get_or_compute(('forecast', file_path, version, filters), compute)
+
+# Revenue model for the what-if simulator as a compiled forest, loaded once per saved
+# pipeline: model_version is its (mtime_ns, size), so a retrained model is re-exported
+# and picked up by a running dashboard
+@st.cache_resource(max_entries=1)
+def get_revenue_model(model_version):
+    from supply_chain.whatif import load_revenue_model
+
+    return load_revenue_model()
+
+# Encoded base rows and predictions per scope, shared by every scenario over that scope
+def load_whatif_base(file_path, version, model_version, scope):
+    from supply_chain.whatif import load_base
+
+    def compute():
+        where, params = where_clause(scope)
+        return load_base(get_connection(file_path, version), get_revenue_model(model_version), where, params)
+    return get_store().get_or_compute(('whatif_base', file_path, version, model_version, scope), compute)
+
+# Predictions per scenario; repeated scenarios are answered from the store's LRU
+def load_scenario(file_path, version, model_version, scope, price_change, quantity_change, carrier, mode):
+    from supply_chain.whatif import run_scenario
+
+    def compute():
+        base = load_whatif_base(file_path, version, model_version, scope)
+        return run_scenario(get_revenue_model(model_version), base, price_change, quantity_change, carrier, mode)
+    return get_store().get_or_compute(
+        ('whatif', file_path, version, model_version, scope, price_change, quantity_change, carrier, mode), compute)
+
+# Explorer row counts and pages per sort, filter and projection
+def load_row_count(file_path, version, filter_column, filter_text):
+    from supply_chain.explorer import count_rows
+
+    return get_store().get_or_compute(
+        ('row_count', file_path, version, filter_column, filter_text),
+        lambda: count_rows(get_connection(file_path, version), filter_column, filter_text))
+
+def load_page(file_path, version, columns, page, sort_by, descending, filter_column, filter_text):
+    from supply_chain.explorer import PAGE_SIZE, fetch_page
+
+    return get_store().get_or_compute(
+        ('page', file_path, version, columns, page, sort_by, descending, filter_column, filter_text),
+        lambda: fetch_page(get_connection(file_path, version), list(columns), page, PAGE_SIZE,
+                           sort_by, descending, filter_column, filter_text))
+
+# Version of the data file; caches are keyed on it so appended rows are picked up
+version = file_version('supply_chain_data.csv')
+published = load_published('supply_chain_data.csv')
+
+# Dataset exploration option; nothing is queried until it is opened, then only the
+# visible page of rows is queried and sent
+if st.checkbox("📋 Explore Dataset", key="explore"):
+    from supply_chain.explorer import PAGE_SIZE
+
+    explore_col1, explore_col2, explore_col3, explore_col4 = st.columns([3, 2, 2, 1])
+    with explore_col1:
+        columns = st.multiselect("Columns", COLUMNS, default=COLUMNS, key="explore_columns")
+    with explore_col2:
+        filter_column = st.selectbox("Filter column", COLUMNS, key="explore_filter_column")
+    with explore_col3:
+        filter_text = st.text_input("Contains", key="explore_filter_text")
+    with explore_col4:
+        descending = st.checkbox("Descending", key="explore_descending")
+    sort_by = st.selectbox("Sort by", [None] + COLUMNS, key="explore_sort_by")
+
+    with section("Dataset explorer"):
+        row_count = load_row_count('supply_chain_data.csv', version, filter_column, filter_text)
+        page_count = max(1, -(-row_count // PAGE_SIZE))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="explore_page")
+
+        page_rows = load_page('supply_chain_data.csv', version, tuple(columns or COLUMNS), page - 1,
+                              sort_by, descending, filter_column, filter_text)
+        st.dataframe(page_rows, use_container_width=True)
+        st.caption(f"Page {page} of {page_count} · {row_count:,} rows")
 
 # Executive summary section
 st.markdown(
@@ -114,657 +336,376 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Create tabs for better organization
-tab1, tab2, tab3 = st.tabs(["Key Metrics", "Production & Manufacturing", "Logistics & Transportation"])
-
-# === TAB 1: KEY METRICS ===
-with tab1:
-    # KPI Row - 3 main metrics with improved styling
-    kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
-    
-    with kpi_col1:
-        # Total Revenue with improved styling
-        query = """
-        SELECT SUM("Revenue generated")::DECIMAL(8, 2) AS total_revenue
-        FROM df
-        """
-        result = duckdb.query(query).df()
-        total_revenue = result['total_revenue'][0]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Indicator(
-            mode="number",
-            value=total_revenue,
-            title={"text": "Total Revenue", "font": {"size": 24, "color": "#ffffff"}},
-            number={"prefix": "$", "valueformat": ".2f", "font": {"size": 32, "color": "#4bc0c0"}},
-            domain={"x": [0, 1], "y": [0, 1]}
-        ))
-        
-        fig.update_layout(
-            height=220,
-            margin=dict(l=10, r=10, t=30, b=10),
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            font_color='white',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with kpi_col2:
-        # Total Orders Quantity with improved styling
-        query = """
-        SELECT SUM("Order quantities") AS "Total Orders Quantity"
-        FROM df
-        """
-        result = duckdb.query(query).fetchall()
-        total_orders_quantity = result[0][0]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Indicator(
-            mode="number",
-            value=total_orders_quantity,
-            title={"text": "Total Orders", "font": {"size": 24, "color": "#ffffff"}},
-            number={"valueformat": ",.0f", "font": {"size": 32, "color": "#9966ff"}},
-            domain={"x": [0, 1], "y": [0, 1]}
-        ))
-        
-        fig.update_layout(
-            height=220,
-            margin=dict(l=10, r=10, t=30, b=10),
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            font_color='white',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with kpi_col3:
-        # Total Availability with improved styling
-        total_availability = df['Availability'].sum()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Indicator(
-            mode="number",
-            value=total_availability,
-            title={"text": "Total Availability", "font": {"size": 24, "color": "#ffffff"}},
-            number={"font": {"size": 32, "color": "#36a2eb"}},
-            domain={"x": [0, 1], "y": [0, 1]}
-        ))
-        
-        fig.update_layout(
-            height=220,
-            margin=dict(l=10, r=10, t=30, b=10),
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            font_color='white',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Revenue analysis section
-    st.markdown("<div class='section-header'>Revenue Analysis</div>", unsafe_allow_html=True)
-    
-    revenue_col1, revenue_col2 = st.columns(2)
-    
-    with revenue_col1:
-        # Revenue by Product Type - Bar chart with consistent colors
-        query = """
-        SELECT "Product Type",
-        SUM("Revenue generated")::DECIMAL(8, 2) AS total_revenue
-        FROM df
-        GROUP BY "Product Type"
-        ORDER BY total_revenue DESC
-        """
-        result = duckdb.query(query).df()
-        
-        fig = px.bar(result, 
-                x='Product type', 
-                y='total_revenue', 
-                title='Revenue by Product Type',
-                labels={'total_revenue': 'Total Revenue ($)', 'Product type': 'Product Type'},
-                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb'])
-        
-        fig.update_layout(
-            xaxis_title="Product Type",
-            yaxis_title="Total Revenue ($)",
-            yaxis_tickprefix="$",
-            yaxis_tickformat=".2f",
-            margin=dict(l=40, r=40, t=50, b=40),
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with revenue_col2:
-        # Revenue Distribution by Location - Pie chart with consistent colors
-        query = """
-        SELECT "location",
-               SUM("Revenue generated")::DECIMAL(8, 2) AS total_revenue
-        FROM df
-        GROUP BY "location"
-        ORDER BY total_revenue DESC
-        """
-        result = duckdb.query(query).df()
-        
-        fig = px.pie(result, 
-                values='total_revenue', 
-                names='Location', 
-                title='Revenue Distribution by Location',
-                labels={'total_revenue': 'Total Revenue ($)', 'Location': 'Location'},
-                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'])
-        
-        fig.update_layout(
-            margin=dict(l=40, r=40, t=50, b=40),
-            font=dict(size=14, color='white'),
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=-0.3,
-                xanchor='center',
-                x=0.5
-            ),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Profitability analysis
-    st.markdown("<div class='section-header'>Profitability Analysis</div>", unsafe_allow_html=True)
-    
-    profit_col1, profit_col2 = st.columns(2)
-    
-    with profit_col1:
-        # Cost vs Price Analysis - Grouped bar chart
-        price_costs_by_product = df.groupby('Product type').agg(
-            Price=('Price', 'sum'),
-            Manufacturing_costs=('Manufacturing costs', 'sum')
-        ).reset_index()
-        
-        price_costs_by_product['Price'] = price_costs_by_product['Price'].round(2)
-        price_costs_by_product['Manufacturing_costs'] = price_costs_by_product['Manufacturing_costs'].round(2)
-        price_costs_by_product['Profit_margin'] = (price_costs_by_product['Price'] - price_costs_by_product['Manufacturing_costs']).round(2)
-        price_costs_by_product = price_costs_by_product.sort_values(by='Product type')
-        
-        fig = px.bar(price_costs_by_product, 
-                x='Product type', 
-                y=['Price', 'Manufacturing_costs'],
-                title='Price vs Manufacturing Costs by Product',
-                labels={'value': 'Amount ($)', 'Product type': 'Product Type', 'variable': 'Cost Type'},
-                color_discrete_sequence=['#4bc0c0', '#ff6384'],
-                barmode='group')
-        
-        fig.update_layout(
-            xaxis_title="Product Type",
-            yaxis_title="Amount ($)",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=-0.3,
-                xanchor='center',
-                x=0.5
-            ),
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with profit_col2:
-        # Overall Profitability - Bar chart with diverging colors
-        profitability_by_product = df.groupby('Product type').agg(
-            Revenue=('Revenue generated', 'sum'),
-            Cost=('Costs', 'sum')
-        ).reset_index()
-        
-        profitability_by_product['Profit'] = (profitability_by_product['Revenue'] - profitability_by_product['Cost']).round(2)
-        profitability_by_product = profitability_by_product.sort_values(by='Product type')
-        
-        fig = px.bar(profitability_by_product, 
-                x='Product type', 
-                y='Profit',
-                title='Overall Profitability by Product Type',
-                labels={'Profit': 'Profit ($)', 'Product type': 'Product Type'},
-                color='Profit',
-                color_continuous_scale=['#ff6384', '#ffb1c1', '#f8f9fa', '#9ee4d9', '#4bc0c0'],
-                color_continuous_midpoint=0)
-        
-        fig.update_layout(
-            xaxis_title="Product Type",
-            yaxis_title="Profit ($)",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-
-# === TAB 2: PRODUCTION & MANUFACTURING ===
-with tab2:
+# === SECTION 1: KEY METRICS ===
+def render_key_metrics(aggregates, totals):
+    with section("KPI Indicators"):
+        # KPI Row - 3 main metrics with improved styling
+        kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
+    
+        with kpi_col1:
+            # Total Revenue with improved styling
+            st.plotly_chart(cached_figure(figures.total_revenue_indicator, round(totals['Revenue generated'], 2)), use_container_width=True)
+    
+        with kpi_col2:
+            # Total Orders Quantity with improved styling
+            st.plotly_chart(cached_figure(figures.total_orders_indicator, totals['Order quantities']), use_container_width=True)
+    
+        with kpi_col3:
+            # Total Availability with improved styling
+            st.plotly_chart(cached_figure(figures.total_availability_indicator, totals['Availability']), use_container_width=True)
+    
+    with section("Revenue Analysis"):
+        # Revenue analysis section
+        st.markdown("<div class='section-header'>Revenue Analysis</div>", unsafe_allow_html=True)
+    
+        revenue_col1, revenue_col2 = st.columns(2)
+    
+        with revenue_col1:
+            # Revenue by Product Type - Bar chart with consistent colors
+            st.plotly_chart(cached_figure(figures.revenue_by_product_bar, aggregates['Product type']), use_container_width=True)
+    
+        with revenue_col2:
+            # Revenue Distribution by Location - Pie chart with consistent colors
+            st.plotly_chart(cached_figure(figures.revenue_by_location_pie, aggregates['Location']), use_container_width=True)
+    
+    with section("Profitability Analysis"):
+        # Profitability analysis
+        st.markdown("<div class='section-header'>Profitability Analysis</div>", unsafe_allow_html=True)
+    
+        profit_col1, profit_col2 = st.columns(2)
+    
+        with profit_col1:
+            # Cost vs Price Analysis - Grouped bar chart
+            st.plotly_chart(cached_figure(figures.price_vs_costs_bar, aggregates['Product type']), use_container_width=True)
+    
+        with profit_col2:
+            # Overall Profitability - Bar chart with diverging colors
+            st.plotly_chart(cached_figure(figures.profitability_bar, aggregates['Product type']), use_container_width=True)
+
+# === SECTION 2: PRODUCTION & MANUFACTURING ===
+def render_production(aggregates, totals):
     # Production metrics
-    st.markdown("<div class='section-header'>Production & Stock Analysis</div>", unsafe_allow_html=True)
-    
-    # Stock and Lead Time Gauges
-    gauge_col1, gauge_col2 = st.columns(2)
-    
-    with gauge_col1:
-        query = """
-        SELECT SUM("stock levels") AS "Stock Levels",
-               SUM("Lead Times") AS "Lead Times"
-        FROM df;
-        """
-        result = duckdb.query(query).df()
-        total_stock_levels = result['Stock Levels'][0]
-        total_lead_times = result['Lead Times'][0]
-        
-        fig_stock_levels = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=total_stock_levels,
-            title={'text': "Total Stock Levels", 'font': {'size': 24, 'color': 'white'}},
-            gauge={
-                'axis': {'range': [0, max(total_stock_levels, total_lead_times) + 100], 'tickfont': {'color': 'white'}},
-                'bar': {'color': "#4bc0c0"},
-                'steps': [
-                    {'range': [0, max(total_stock_levels, total_lead_times) / 3], 'color': "rgba(75, 192, 192, 0.2)"},
-                    {'range': [max(total_stock_levels, total_lead_times) / 3, max(total_stock_levels, total_lead_times) * 2/3], 'color': "rgba(75, 192, 192, 0.4)"},
-                    {'range': [max(total_stock_levels, total_lead_times) * 2/3, max(total_stock_levels, total_lead_times)], 'color': "rgba(75, 192, 192, 0.6)"}
-                ],
-                'threshold': {
-                    'line': {'color': "white", 'width': 2},
-                    'thickness': 0.75,
-                    'value': total_stock_levels
-                }
-            },
-            number={'font': {'color': '#4bc0c0', 'size': 28}}
-        ))
-        
-        fig_stock_levels.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=60, b=20),
-            font=dict(color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig_stock_levels, use_container_width=True)
-    
-    with gauge_col2:
-        fig_lead_times = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=total_lead_times,
-            title={'text': "Total Lead Times", 'font': {'size': 24, 'color': 'white'}},
-            gauge={
-                'axis': {'range': [0, max(total_stock_levels, total_lead_times) + 100], 'tickfont': {'color': 'white'}},
-                'bar': {'color': "#9966ff"},
-                'steps': [
-                    {'range': [0, max(total_stock_levels, total_lead_times) / 3], 'color': "rgba(153, 102, 255, 0.2)"},
-                    {'range': [max(total_stock_levels, total_lead_times) / 3, max(total_stock_levels, total_lead_times) * 2/3], 'color': "rgba(153, 102, 255, 0.4)"},
-                    {'range': [max(total_stock_levels, total_lead_times) * 2/3, max(total_stock_levels, total_lead_times)], 'color': "rgba(153, 102, 255, 0.6)"}
-                ],
-                'threshold': {
-                    'line': {'color': "white", 'width': 2},
-                    'thickness': 0.75,
-                    'value': total_lead_times
-                }
-            },
-            number={'font': {'color': '#9966ff', 'size': 28}}
-        ))
-        
-        fig_lead_times.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=60, b=20),
-            font=dict(color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig_lead_times, use_container_width=True)
-    
-    # Manufacturing analysis
-    st.markdown("<div class='section-header'>Manufacturing Analysis</div>", unsafe_allow_html=True)
-    
-    manuf_col1, manuf_col2 = st.columns(2)
-    
-    with manuf_col1:
-        # Manufacturing Costs by Product Type - Bar chart with gradients
-        costs_by_product = df.groupby('Product type')['Manufacturing costs'].sum().reset_index()
-        costs_by_product['Manufacturing costs'] = costs_by_product['Manufacturing costs'].round(2)
-        costs_by_product = costs_by_product.sort_values(by='Manufacturing costs', ascending=False)
-        
-        fig = px.bar(costs_by_product, 
-                x='Product type', 
-                y='Manufacturing costs', 
-                title='Manufacturing Costs by Product',
-                labels={'Manufacturing costs': 'Manufacturing Costs ($)', 'Product type': 'Product Type'},
-                color='Manufacturing costs',
-                color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'])
-        
-        fig.update_layout(
-            xaxis_title="Product Type",
-            yaxis_title="Manufacturing Costs ($)",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with manuf_col2:
-        # Manufacturing Costs vs Production Volumes - Scatter plot with trend line
-        production_summary = df.groupby('Production volumes')['Manufacturing costs'].sum().reset_index()
-        
-        fig = px.scatter(production_summary, 
-                x='Production volumes', 
-                y='Manufacturing costs', 
-                trendline='ols',
-                title='Manufacturing Costs vs Production Volumes',
-                labels={'Manufacturing costs': 'Manufacturing Costs ($)', 'Production volumes': 'Production Volumes'},
-                color_discrete_sequence=['#4bc0c0'])
-        
-        fig.update_traces(marker=dict(size=10))
-        
-        fig.update_layout(
-            xaxis_title="Production Volumes",
-            yaxis_title="Manufacturing Costs ($)",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        # Update trendline color
-        for trace in fig.data:
-            if trace.mode == 'lines':
-                trace.line.color = '#ff6384'
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Quality and Defects Analysis
-    st.markdown("<div class='section-header'>Quality & Defects Analysis</div>", unsafe_allow_html=True)
-    
-    defect_col1, defect_col2 = st.columns(2)
-    
-    with defect_col1:
-        # Manufacturing Costs by Inspection Results - Pie chart with modern colors
-        cost_summary = df.groupby('Inspection results').agg({'Manufacturing costs': 'sum'}).reset_index()
-        total_costs = cost_summary['Manufacturing costs'].sum()
-        cost_summary['Percentage Contribution'] = (cost_summary['Manufacturing costs'] / total_costs * 100).round(2)
-        cost_summary['Manufacturing costs'] = cost_summary['Manufacturing costs'].astype(float).round(2)
-        cost_summary['Percentage Contribution'] = cost_summary['Percentage Contribution'].astype(float).round(2)
-        cost_summary = cost_summary.sort_values(by='Manufacturing costs', ascending=False)
-        
-        fig = px.pie(
-            cost_summary,
-            names='Inspection results',
-            values='Manufacturing costs',
-            title='Manufacturing Costs by Inspection Results',
-            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'],
-            hole=0.4
-        )
-        
-        fig.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hoverinfo='label+value+percent'
-        )
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            showlegend=False,
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with defect_col2:
-        # Defect Rates Analysis - Sunburst chart with modern colors
-        sum_defect_rates = df.groupby('Inspection results')['Defect rates'].sum().reset_index()
-        total_defect_rate = df['Defect rates'].sum()
-        sum_defect_rates['Percentage of Total Defect Rate'] = (sum_defect_rates['Defect rates'] / total_defect_rate * 100)
-        avg_defect_rate = df.groupby('Inspection results')['Defect rates'].mean().reset_index()
-        result = pd.merge(sum_defect_rates, avg_defect_rate, on='Inspection results', suffixes=('_sum', '_avg'))
-        result = result.sort_values(by='Defect rates_sum', ascending=False)
-        
-        fig = px.sunburst(result, path=['Inspection results'], values='Defect rates_sum',
-                    hover_data=['Percentage of Total Defect Rate', 'Defect rates_avg'],
-                    title='Defect Rates by Inspection Results',
-                    color='Defect rates_sum',
-                    color_continuous_scale=['#4bc0c0', '#9966ff', '#36a2eb'])
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)', 
-            paper_bgcolor='rgba(30, 33, 48, 0.8)', 
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-
-# === TAB 3: LOGISTICS & TRANSPORTATION ===
-with tab3:
+    with section("Production & Stock Analysis"):
+        st.markdown("<div class='section-header'>Production & Stock Analysis</div>", unsafe_allow_html=True)
+    
+        # Stock and Lead Time Gauges
+        gauge_col1, gauge_col2 = st.columns(2)
+    
+        with gauge_col1:
+            st.plotly_chart(cached_figure(figures.stock_levels_gauge, totals['Stock levels'], totals['Lead times']), use_container_width=True)
+    
+        with gauge_col2:
+            st.plotly_chart(cached_figure(figures.lead_times_gauge, totals['Stock levels'], totals['Lead times']), use_container_width=True)
+    
+    with section("Manufacturing Analysis"):
+        # Manufacturing analysis
+        st.markdown("<div class='section-header'>Manufacturing Analysis</div>", unsafe_allow_html=True)
+    
+        manuf_col1, manuf_col2 = st.columns(2)
+    
+        with manuf_col1:
+            # Manufacturing Costs by Product Type - Bar chart with gradients
+            st.plotly_chart(cached_figure(figures.manufacturing_costs_bar, aggregates['Product type']), use_container_width=True)
+    
+        with manuf_col2:
+            # Manufacturing Costs vs Production Volumes - Scatter plot with trend line
+            st.plotly_chart(cached_figure(figures.costs_vs_volumes_scatter, aggregates['Production volumes']), use_container_width=True)
+    
+    with section("Quality & Defects Analysis"):
+        # Quality and Defects Analysis
+        st.markdown("<div class='section-header'>Quality & Defects Analysis</div>", unsafe_allow_html=True)
+    
+        defect_col1, defect_col2 = st.columns(2)
+    
+        with defect_col1:
+            # Manufacturing Costs by Inspection Results - Pie chart with modern colors
+            st.plotly_chart(cached_figure(figures.costs_by_inspection_pie, aggregates['Inspection results']), use_container_width=True)
+    
+        with defect_col2:
+            # Defect Rates Analysis - Sunburst chart with modern colors
+            st.plotly_chart(cached_figure(figures.defect_rates_sunburst, aggregates['Inspection results']), use_container_width=True)
+
+# === SECTION 3: LOGISTICS & TRANSPORTATION ===
+def render_logistics(aggregates, totals):
     # Transportation overview
-    st.markdown("<div class='section-header'>Transportation Mode Analysis</div>", unsafe_allow_html=True)
-    
-    transport_col1, transport_col2 = st.columns(2)
-    
-    with transport_col1:
-        # Transportation Modes Distribution - Sunburst chart
-        order_summary = df.groupby('Transportation modes')['Order quantities'].sum().reset_index()
-        
-        fig = px.sunburst(
-            order_summary,
-            path=['Transportation modes'],
-            values='Order quantities',
-            title='Order Quantities by Transportation Mode',
-            color='Order quantities',
-            color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'],
-        )
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with transport_col2:
-        # Transportation Modes Frequency - Pie chart with hole
-        mode_counts = df['Transportation modes'].value_counts()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Pie(
-            labels=mode_counts.index,
-            values=mode_counts.values,
-            textinfo='percent',
-            marker_colors=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'],
-            textposition='inside',
-            hole=0.6
-        ))
-        
-        fig.update_layout(
-            title='Frequency of Transportation Modes',
-            annotations=[dict(text='Transport<br>Modes', x=0.5, y=0.5, font_size=15, showarrow=False, font_color='white')],
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            showlegend=True,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=-0.3,
-                xanchor='center',
-                x=0.5
-            ),
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Shipping and Lead Times Analysis
-    st.markdown("<div class='section-header'>Shipping & Lead Times Analysis</div>", unsafe_allow_html=True)
-    
-    shipping_col1, shipping_col2 = st.columns(2)
-    
-    with shipping_col1:
-        # Average Lead Time vs Shipping Time by Transportation Mode - Line chart
-        numeric_columns = ['Shipping times', 'Lead times']
-        transport_summary = df.groupby('Transportation modes')[numeric_columns].mean().reset_index()
-        
-        fig = px.line(transport_summary, 
-                x='Shipping times', 
-                y='Lead times', 
-                color='Transportation modes',
-                title='Lead Times vs. Shipping Times by Transport Mode',
-                labels={'Shipping times': 'Shipping Times (days)', 'Lead times': 'Lead Times (days)', 'Transportation modes': 'Transportation Mode'},
-                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'],
-                line_shape='spline')
-        
-        fig.update_traces(mode='lines+markers', marker=dict(size=10))
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            xaxis_title='Shipping Times (days)',
-            yaxis_title='Lead Times (days)',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with shipping_col2:
-        # Average Lead Time by Product Type - Bar chart with color gradient
-        average_lead_time_by_product = df.groupby('Product type')['Lead times'].mean().reset_index()
-        average_lead_time_by_product['Average Lead Time'] = average_lead_time_by_product['Lead times'].round(2)
-        average_lead_time_by_product = average_lead_time_by_product.sort_values(by='Product type')
-        
-        fig = px.bar(average_lead_time_by_product, 
-                x='Product type', 
-                y='Average Lead Time',
-                title='Average Lead Time by Product Type',
-                labels={'Average Lead Time': 'Average Lead Time (days)', 'Product type': 'Product Type'},
-                color='Average Lead Time',
-                color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'],
-                )
-        
-        fig.update_layout(
-            xaxis_title="Product Type",
-            yaxis_title="Average Lead Time (days)",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Shipping Costs Analysis
-    st.markdown("<div class='section-header'>Shipping Cost Analysis</div>", unsafe_allow_html=True)
-    
-    cost_col1, cost_col2 = st.columns(2)
-    
-    with cost_col1:
-        # Shipping Costs by Carrier - Bar chart with categories
-        shipping_summary = df.groupby('Shipping carriers')['Shipping costs'].sum().reset_index()
-        
-        fig = px.bar(
-            shipping_summary,
-            x='Shipping carriers',
-            y='Shipping costs',
-            title='Distribution of Shipping Costs by Carrier',
-            labels={'Shipping carriers': 'Shipping Carriers', 'Shipping costs': 'Shipping Costs ($)'},
-            color='Shipping carriers',
-            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384']
-        )
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            xaxis_title=None,
-            yaxis_title='Shipping Costs ($)',
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            showlegend=False,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with cost_col2:
-        # Shipping Costs by Transportation Mode - Bar chart with consistent colors
-        transportation_summary = df.groupby('Transportation modes')['Shipping costs'].sum().reset_index()
-        
-        fig = px.bar(transportation_summary, 
-                x='Transportation modes', 
-                y='Shipping costs', 
-                title='Shipping Costs by Transportation Mode',
-                labels={'Shipping costs': 'Shipping Costs ($)', 'Transportation modes': 'Transportation Mode'},
-                color='Transportation modes',
-                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'])
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            xaxis_title='Transportation Modes',
-            yaxis_title='Shipping Costs ($)',
-            showlegend=False,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Location analysis
-    st.markdown("<div class='section-header'>Location & Production Analysis</div>", unsafe_allow_html=True)
-    
-    location_col1, location_col2 = st.columns(2)
-    
-    with location_col1:
-        # Production Volumes by Location - Treemap with modern colors
-        location_summary = df.groupby('Location').agg({'Production volumes': 'sum'}).reset_index()
-        location_summary = location_summary.sort_values(by='Production volumes', ascending=False)
-        
-        fig = px.treemap(
-            location_summary,
-            path=['Location'],
-            values='Production volumes',
-            color='Production volumes',
-            color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff', '#ffcd56'],
-            title='Production Volumes by Location'
-        )
-        
-        fig.update_layout(
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with location_col2:
-        # Order Quantities by Location - Bar chart with consistent colors
-        result = df.groupby('Location')['Order quantities'].sum().reset_index()
-        result = result.sort_values(by='Order quantities', ascending=False)
-        
-        fig = px.bar(result, x='Location', y='Order quantities',
-                title='Order Quantities by Location',
-                labels={'Location': 'Location', 'Order quantities': 'Total Order Quantities'},
-                color='Location',
-                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'])
-        
-        fig.update_layout(
-            xaxis_title="Location",
-            yaxis_title="Total Order Quantities",
-            font=dict(size=14, color='white'),
-            plot_bgcolor='rgba(30, 33, 48, 0)',
-            paper_bgcolor='rgba(30, 33, 48, 0.8)',
-            bargap=0.2,
-            showlegend=False,
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+    with section("Transportation Mode Analysis"):
+        st.markdown("<div class='section-header'>Transportation Mode Analysis</div>", unsafe_allow_html=True)
+    
+        transport_col1, transport_col2 = st.columns(2)
+    
+        with transport_col1:
+            # Transportation Modes Distribution - Sunburst chart
+            st.plotly_chart(cached_figure(figures.orders_by_mode_sunburst, aggregates['Transportation modes']), use_container_width=True)
+    
+        with transport_col2:
+            # Transportation Modes Frequency - Pie chart with hole
+            st.plotly_chart(cached_figure(figures.mode_frequency_pie, aggregates['Transportation modes']), use_container_width=True)
+    
+    with section("Shipping & Lead Times Analysis"):
+        # Shipping and Lead Times Analysis
+        st.markdown("<div class='section-header'>Shipping & Lead Times Analysis</div>", unsafe_allow_html=True)
+    
+        shipping_col1, shipping_col2 = st.columns(2)
+    
+        with shipping_col1:
+            # Average Lead Time vs Shipping Time by Transportation Mode - Line chart
+            st.plotly_chart(cached_figure(figures.lead_vs_shipping_line, aggregates['Transportation modes']), use_container_width=True)
+    
+        with shipping_col2:
+            # Average Lead Time by Product Type - Bar chart with color gradient
+            st.plotly_chart(cached_figure(figures.lead_time_by_product_bar, aggregates['Product type']), use_container_width=True)
+    
+    with section("Shipping Cost Analysis"):
+        # Shipping Costs Analysis
+        st.markdown("<div class='section-header'>Shipping Cost Analysis</div>", unsafe_allow_html=True)
+    
+        cost_col1, cost_col2 = st.columns(2)
+    
+        with cost_col1:
+            # Shipping Costs by Carrier - Bar chart with categories
+            st.plotly_chart(cached_figure(figures.shipping_costs_by_carrier_bar, aggregates['Shipping carriers']), use_container_width=True)
+    
+        with cost_col2:
+            # Shipping Costs by Transportation Mode - Bar chart with consistent colors
+            st.plotly_chart(cached_figure(figures.shipping_costs_by_mode_bar, aggregates['Transportation modes']), use_container_width=True)
+    
+    with section("Location & Production Analysis"):
+        # Location analysis
+        st.markdown("<div class='section-header'>Location & Production Analysis</div>", unsafe_allow_html=True)
+    
+        location_col1, location_col2 = st.columns(2)
+    
+        with location_col1:
+            # Production Volumes by Location - Treemap with modern colors
+            st.plotly_chart(cached_figure(figures.production_by_location_treemap, aggregates['Location']), use_container_width=True)
+    
+        with location_col2:
+            # Order Quantities by Location - Bar chart with consistent colors
+            st.plotly_chart(cached_figure(figures.orders_by_location_bar, aggregates['Location']), use_container_width=True)
+
+# Global filters applied to every chart
+with st.expander("🔎 Filters"):
+    with section("Filter options"):
+        options = load_filter_options('supply_chain_data.csv', version, published)
+    filter_cols = st.columns(len(FILTER_COLUMNS))
+    selection = {}
+    for filter_col, column in zip(filter_cols, FILTER_COLUMNS):
+        with filter_col:
+            selection[column] = st.multiselect(column, options[column], key=f"filter_{column}")
+
+filters = normalize(selection)
+
+# Fast preview: sample-based estimates paint first and are replaced once the exact aggregates are ready
+def render_preview(estimates):
+    estimated = estimates['totals']
+
+    def interval(name, prefix=''):
+        return f"95% CI {prefix}{estimated[name + ' low']:,.0f} – {prefix}{estimated[name + ' high']:,.0f}"
+
+    preview_cols = st.columns(5)
+    preview_cols[0].metric("Total Revenue ≈", f"${estimated['Revenue generated']:,.0f}", help=interval('Revenue generated', '$'))
+    preview_cols[1].metric("Total Orders ≈", f"{estimated['Order quantities']:,.0f}", help=interval('Order quantities'))
+    preview_cols[2].metric("Total Stock Levels ≈", f"{estimated['Stock levels']:,.0f}", help=interval('Stock levels'))
+    preview_cols[3].metric("Total Lead Times ≈", f"{estimated['Lead times']:,.0f}", help=interval('Lead times'))
+    preview_cols[4].metric("Distinct SKUs ≈", f"{estimates['distinct_skus']:,}", help="Estimated from the sample")
+    st.plotly_chart(cached_figure(figures.estimated_revenue_bar, estimates['by_product']), use_container_width=True)
+    st.caption(f"Estimated from a {estimates['rate']:.2%} sample taken at the last refresh · exact results are loading…")
+
+fast_preview = st.checkbox("⚡ Fast preview", key="fast_preview",
+                           help="Show sample-based estimates first on very large datasets")
+preview = st.empty()
+if fast_preview:
+    with preview.container(), section("Fast preview"):
+        estimates = load_estimates('supply_chain_data.csv', filters)
+        if estimates is not None:
+            render_preview(estimates)
+
+with st.spinner('Computing aggregates...'), section("Aggregates"):
+    if filters:
+        aggregates = load_filtered_aggregates('supply_chain_data.csv', version, filters)
+    else:
+        aggregates = load_aggregates('supply_chain_data.csv', version, published)
+    totals = aggregates[TOTAL].iloc[0]
+preview.empty()
+snapshot_placeholder.empty()
+if not filters and published is not None and published['stale']:
+    st.caption("Showing the last published results; the precompute worker is refreshing them for the latest data.")
+
+# === SECTION 4: DRILL-DOWN ===
+def render_drilldown(filters):
+    from supply_chain.cube import CUBE_DIMENSIONS, CUBE_MEASURES, lookup
+
+    st.markdown("<div class='section-header'>Drill-down Analysis</div>", unsafe_allow_html=True)
+
+    drill_col1, drill_col2, drill_col3 = st.columns([3, 2, 1])
+    with drill_col1:
+        by = st.multiselect("Drill down by", CUBE_DIMENSIONS, default=["Product type", "Location"], key="drill_by")
+    with drill_col2:
+        measure = st.selectbox("Measure", CUBE_MEASURES, key="drill_measure")
+    with drill_col3:
+        statistic = st.radio("Statistic", ["Sum", "Mean"], key="drill_statistic")
+
+    if not by:
+        st.info("Pick at least one dimension to drill down by.")
+        return
+
+    # Served by lookup from the precomputed cube; global filters select cube cells
+    with section("Cube lookup"):
+        result = lookup(load_cube('supply_chain_data.csv', version, published), by, filters)
+    value = measure if statistic == "Sum" else f"{measure} (mean)"
+    st.plotly_chart(cached_figure(figures.drilldown_chart, result, tuple(by), value), use_container_width=True)
+    st.dataframe(result[by + [value, 'row_count']], use_container_width=True)
+
+# === SECTION 5: ROUTE OPTIMIZATION ===
+def render_optimization(filters):
+    from supply_chain.optimization import optimize_lanes, summarize
+
+    st.markdown("<div class='section-header'>Route & Carrier Optimization</div>", unsafe_allow_html=True)
+
+    slack_col1, slack_col2 = st.columns(2)
+    with slack_col1:
+        time_slack = st.slider("Extra shipping days allowed", 0.0, 5.0, 0.0, 0.5, key="optimize_time_slack")
+    with slack_col2:
+        capacity_slack = st.slider("Extra carrier capacity (share)", 0.0, 1.0, 0.1, 0.05, key="optimize_capacity_slack")
+
+    with section("Lane optimization"):
+        lanes = load_lanes('supply_chain_data.csv', version, filters)
+        if lanes.empty:
+            st.info("No SKUs match the current filters.")
+            return
+        plan = optimize_lanes(lanes, time_slack, capacity_slack)
+        summary = summarize(plan)
+
+    opt_col1, opt_col2, opt_col3, opt_col4 = st.columns(4)
+    opt_col1.metric("Current cost", f"${summary['current cost']:,.2f}")
+    opt_col2.metric("Optimized cost", f"${summary['optimized cost']:,.2f}")
+    opt_col3.metric("Savings", f"${summary['savings']:,.2f}", f"{summary['savings share']:.1%}")
+    opt_col4.metric("SKUs moved", f"{summary['moved skus']:,}")
+
+    moves = plan[plan['source'] != plan['target']].sort_values('savings', ascending=False)
+    st.dataframe(moves.drop(columns=['source', 'target']).round(2), use_container_width=True)
+    st.caption("Costs are the observed average of Shipping costs plus Costs per SKU on each lane. SKUs only "
+               "move to lanes whose average shipping time is within the allowed extra days of their current lane's.")
+
+# === SECTION 6: STOCK-OUT RISK ===
+def render_risk(filters):
+    from supply_chain.simulation import summarize_by_product
+
+    st.markdown("<div class='section-header'>Stock-out Risk Simulation</div>", unsafe_allow_html=True)
+
+    risk_col1, risk_col2 = st.columns(2)
+    with risk_col1:
+        scenarios = st.select_slider("Scenarios", [1_000, 2_000, 5_000, 10_000, 20_000], value=10_000, key="risk_scenarios")
+    with risk_col2:
+        service_level = st.slider("Target service level", 0.80, 0.99, 0.95, 0.01, key="risk_service_level")
+
+    with section("Stock-out simulation"):
+        result = load_simulation('supply_chain_data.csv', version, filters, scenarios, service_level)
+        if result.empty:
+            st.info("No SKUs match the current filters.")
+            return
+        by_product = summarize_by_product(result)
+
+    risk_metric1, risk_metric2, risk_metric3 = st.columns(3)
+    risk_metric1.metric("Expected SKUs out of stock", f"{result['Stock-out probability'].sum():,.1f}")
+    risk_metric2.metric("Recommended safety stock", f"{result['Safety stock'].sum():,.0f}")
+    risk_metric3.metric("Additional stock needed", f"{result['Additional stock needed'].sum():,.0f}")
+
+    st.plotly_chart(cached_figure(figures.stockout_risk_bar, by_product), use_container_width=True)
+    st.markdown("**SKUs most at risk**")
+    st.dataframe(result.nlargest(20, 'Stock-out probability').round(3), use_container_width=True)
+    st.caption(f"{scenarios:,} replenishment scenarios per SKU. Supplier and manufacturing lead times vary "
+               f"around their observed values; demand runs at each SKU's yearly sales rate.")
+
+# === SECTION 7: DEMAND FORECAST ===
+def render_forecast(filters):
+    from supply_chain.forecasting import HORIZON
+
+    st.markdown("<div class='section-header'>Demand Forecast</div>", unsafe_allow_html=True)
+
+    with section("Demand forecast"):
+        result = load_forecast('supply_chain_data.csv', version, filters)
+    if result.empty:
+        st.info("No SKUs match the current filters.")
+        return
+
+    forecast_col1, forecast_col2, forecast_col3 = st.columns(3)
+    forecast_col1.metric("Series", f"{len(result):,}")
+    forecast_col2.metric("Forecast units per step", f"{result['Forecast'].sum():,.0f}")
+    forecast_col3.metric(f"Forecast units, next {HORIZON} steps", f"{result[f'Forecast next {HORIZON}'].sum():,.0f}")
+
+    st.plotly_chart(cached_figure(figures.demand_forecast_bar, result), use_container_width=True)
+    st.dataframe(result.round(2), use_container_width=True)
+    st.caption("Simple exponential smoothing per product type and location. The dataset has no dates, "
+               "so each series is its SKUs' units sold in file order.")
+
+# === SECTION 8: WHAT-IF SIMULATOR ===
+def render_whatif(filters):
+    from supply_chain.prediction import MODEL_PATH
+
+    st.markdown("<div class='section-header'>What-if Revenue Simulator</div>", unsafe_allow_html=True)
+
+    try:
+        model_version = file_version(MODEL_PATH)
+        get_revenue_model(model_version)
+    except Exception as exc:
+        st.warning(f"The revenue model could not be loaded: {exc}")
+        return
+
+    options = load_filter_options('supply_chain_data.csv', version, published)
+    whatif_col1, whatif_col2, whatif_col3 = st.columns(3)
+    with whatif_col1:
+        group = st.selectbox("Product group", ["All"] + options['Product type'], key="whatif_group")
+        price_change = st.slider("Price change (%)", -50, 50, 0, 5, key="whatif_price")
+    with whatif_col2:
+        carrier = st.selectbox("Shipping carrier", ["Unchanged"] + options['Shipping carriers'], key="whatif_carrier")
+        quantity_change = st.slider("Order quantities change (%)", -50, 50, 0, 5, key="whatif_quantity")
+    with whatif_col3:
+        mode = st.selectbox("Transportation mode", ["Unchanged"] + options['Transportation modes'], key="whatif_mode")
+
+    # The product group narrows the global filters to the SKUs the scenario applies to
+    scope = dict(filters)
+    if group != "All":
+        scope['Product type'] = [group]
+    scope = normalize(scope)
+
+    with section("What-if scenario"):
+        result, seconds = load_scenario('supply_chain_data.csv', version, model_version, scope, price_change / 100,
+                                        quantity_change / 100, None if carrier == "Unchanged" else carrier,
+                                        None if mode == "Unchanged" else mode)
+    if result.empty:
+        st.info("No SKUs match the current filters.")
+        return
+
+    current = result['Predicted revenue generated'].sum()
+    scenario = result['Scenario revenue'].sum()
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    metric_col1.metric("Predicted revenue", f"${current:,.2f}")
+    metric_col2.metric("Scenario revenue", f"${scenario:,.2f}", f"{(scenario - current) / current:+.1%}" if current else None)
+    metric_col3.metric("SKUs affected", f"{len(result):,}")
+
+    by_product = result.groupby('Product type', observed=True)[['Predicted revenue generated', 'Scenario revenue']].sum().reset_index()
+    st.plotly_chart(cached_figure(figures.whatif_revenue_bar, by_product), use_container_width=True)
+    st.dataframe(result.reindex(result['Change'].abs().sort_values(ascending=False).index).head(20).round(2),
+                 use_container_width=True)
+    st.caption(f"{len(result):,} SKUs predicted in {seconds * 1000:,.0f} ms by the compiled revenue model.")
+
+# Only the selected section is computed and sent to the browser; unlike st.tabs,
+# hidden sections cost nothing until they are opened
+SECTIONS = {
+    "Key Metrics": partial(render_key_metrics, aggregates, totals),
+    "Production & Manufacturing": partial(render_production, aggregates, totals),
+    "Logistics & Transportation": partial(render_logistics, aggregates, totals),
+    "Drill-down": partial(render_drilldown, filters),
+    "Route Optimization": partial(render_optimization, filters),
+    "Stock-out Risk": partial(render_risk, filters),
+    "Demand Forecast": partial(render_forecast, filters),
+    "What-if Simulator": partial(render_whatif, filters),
+}
+
+selected_section = st.radio("Section", list(SECTIONS), horizontal=True, label_visibility="collapsed", key="section")
+with section(f"Section: {selected_section}"):
+    SECTIONS[selected_section]()
 
 # Footer
 st.markdown(
@@ -777,4 +718,19 @@ st.markdown(
     </div>
     """,
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# Debug panel with this run's profile
+if profiler is not None:
+    with st.expander("🛠 Profiling", expanded=True):
+        profile = profiler.to_frame()
+        st.dataframe(profile.drop(columns=['plan']), use_container_width=True)
+        for record in profiler.records:
+            if record.get('plan'):
+                st.markdown(f"**{record['name']}**")
+                st.code(record['plan'])
+        st.download_button("Download profile (JSON lines)", profiler.to_json_lines(), file_name="profile.jsonl")
+        store_stats = get_store().stats()
+        st.caption(f"Shared store: {store_stats['entries']} entries, "
+                   f"{store_stats['bytes'] / 1024 ** 2:,.1f} of {store_stats['max_bytes'] / 1024 ** 2:,.0f} MB")
+deactivate(profiler_token)
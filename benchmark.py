@@ -0,0 +1,43 @@
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from supply_chain.benchmarks import CASES, environment, run_benchmarks
+from supply_chain.synthetic import fit_profile, write_csv
+
+# Time dashboard aggregations, figure builds, data loading and the revenue model on synthetic data
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard and model on synthetic data.")
+    parser.add_argument("--sizes", default="1e3,1e4,1e5",
+                        help="comma-separated row counts to generate, from 1e3 up to 1e8")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated cases to run")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per case")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write results to")
+    parser.add_argument("--source", default="supply_chain_data.csv", help="CSV the synthetic data is modelled on")
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    profile = fit_profile(args.source)
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as data_dir:
+        datasets = []
+        for rows in sizes:
+            csv_path = Path(data_dir) / f"supply_chain_{rows}.csv"
+            write_csv(profile, csv_path, rows)
+            datasets.append((rows, csv_path))
+
+        def report(result):
+            timing = (f"{result['seconds']:.3f}s, peak {result['peak_rss_mb']:.0f} MB (+{result['run_rss_mb']:.0f} MB in run)"
+                      if "seconds" in result else result["error"])
+            print(f"{result['case']:<28} {result['rows']:>12,}  {timing}")
+
+        results = run_benchmarks(datasets, args.cases.split(","), args.timeout, report)
+
+    with open(args.output, "w") as output:
+        json.dump({"environment": environment(), "results": results}, output, indent=2)
+
+
+# Cases run in spawned processes, which re-import this module
+if __name__ == "__main__":
+    main()
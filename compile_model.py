@@ -0,0 +1,21 @@
+import argparse
+import os
+import time
+
+import joblib
+
+from supply_chain.forest import COMPILED_PATH, export_forest, load_compiled, model_source
+from supply_chain.prediction import MODEL_PATH
+
+# Flatten a trained revenue pipeline into the array-backed format read by supply_chain.forest
+parser = argparse.ArgumentParser(description="Compile the revenue model into memory-mappable arrays.")
+parser.add_argument("model", nargs="?", default=MODEL_PATH, help="trained pipeline (.joblib)")
+parser.add_argument("output", nargs="?", default=COMPILED_PATH, help="compiled forest to write")
+args = parser.parse_args()
+
+export_forest(joblib.load(args.model), args.output, model_source(args.model))
+
+start = time.perf_counter()
+load_compiled(args.output)
+print(f"Compiled {os.path.getsize(args.model):,} bytes into {os.path.getsize(args.output):,} bytes; "
+      f"loads in {time.perf_counter() - start:.4f}s")
@@ -0,0 +1,33 @@
+import argparse
+import time
+
+from supply_chain.synthetic import CHUNK_ROWS, fit_profile, write_csv, write_parts
+
+
+# Generate realistic synthetic supply chain rows for load and benchmark testing
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic rows modelled on supply_chain_data.csv.")
+    parser.add_argument("rows", type=float, help="number of rows to generate, e.g. 1e8")
+    parser.add_argument("output", help="directory of part files, or a .csv file for a single CSV")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="format of the part files")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per part file")
+    parser.add_argument("--workers", type=int, default=None, help="generator processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default="supply_chain_data.csv", help="CSV whose distributions are learned")
+    args = parser.parse_args()
+
+    rows = int(args.rows)
+    profile = fit_profile(args.source)
+    start = time.perf_counter()
+    if args.output.endswith(".csv"):
+        write_csv(profile, args.output, rows, args.chunk_rows, args.workers, args.seed)
+    else:
+        write_parts(profile, args.output, rows, args.format, args.chunk_rows, args.workers, args.seed)
+    seconds = time.perf_counter() - start
+
+    print(f"Generated {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+# Parts are written by a process pool; spawned workers re-import this module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import logging
+import time
+
+from supply_chain.publish import KEEP_VERSIONS, publish, read_published
+
+logger = logging.getLogger("supply_chain.precompute")
+
+# Publish attempts per check while the dataset keeps changing under them
+MAX_ATTEMPTS = 5
+
+
+def publish_with_backoff(csv_path, materialize, keep, delay, attempts=MAX_ATTEMPTS):
+    # Retry after a pause that doubles each time while the file changes during
+    # publishing; after attempts tries the last published version stays live
+    # until the next check
+    for attempt in range(1, attempts + 1):
+        manifest = publish(csv_path, materialize=materialize, keep=keep)
+        if manifest is not None:
+            return manifest
+        logger.info("%s changed while publishing (attempt %d of %d)", csv_path, attempt, attempts)
+        if attempt < attempts:
+            time.sleep(delay)
+            delay *= 2
+    logger.warning("%s kept changing; keeping the last published version", csv_path)
+    return None
+
+
+def main():
+    # Keep the dashboard's published aggregates up to date off the request path
+    parser = argparse.ArgumentParser(description="Recompute and publish dashboard aggregates whenever the data changes.")
+    parser.add_argument("csv", nargs="?", default="supply_chain_data.csv", help="dataset to watch")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between checks of the dataset")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="published versions kept on disk")
+    parser.add_argument("--stream", action="store_true", help="query the CSV in place instead of loading it")
+    parser.add_argument("--once", action="store_true", help="publish once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    while True:
+        published = read_published(args.csv)
+        if published is None or published["stale"]:
+            manifest = publish_with_backoff(args.csv, not args.stream, args.keep, args.interval)
+            if manifest is not None:
+                logger.info("Published %s in %.2fs", manifest["version"], manifest["seconds"])
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
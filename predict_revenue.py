@@ -0,0 +1,17 @@
+import argparse
+
+from supply_chain.prediction import BATCH_ROWS, MODEL_PATH, load_model, score_file
+
+# Score a catalog snapshot (CSV or Parquet) with the trained revenue model
+parser = argparse.ArgumentParser(description="Predict 'Revenue generated' for a batch of SKU rows.")
+parser.add_argument("input", help="CSV or Parquet file with supply chain rows")
+parser.add_argument("output", help="CSV or Parquet file to write predictions to")
+parser.add_argument("--model", default=MODEL_PATH, help="trained pipeline (.joblib) or compiled forest (.forest) to score with")
+parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="rows scored per batch")
+parser.add_argument("--n-jobs", type=int, default=-1, help="cores used by the forest (-1 for all)")
+args = parser.parse_args()
+
+model = load_model(args.model, args.n_jobs)
+rows, seconds = score_file(args.input, args.output, args.batch_rows, model)
+
+print(f"Scored {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
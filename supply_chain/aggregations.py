@@ -0,0 +1,110 @@
+import duckdb
+import pandas as pd
+
+from supply_chain.database import query
+from supply_chain.schema import quote
+
+# Grouping keys used by the dashboard charts
+DIMENSIONS = [
+    "Product type",
+    "Location",
+    "Transportation modes",
+    "Shipping carriers",
+    "Inspection results",
+    "Production volumes",
+    "Supplier name",
+]
+
+# Additive measures needed by the charts; means are derived from these sums
+# and the per-group row count, so partial results can be merged later on
+MEASURES = [
+    "Revenue generated",
+    "Costs",
+    "Price",
+    "Manufacturing costs",
+    "Order quantities",
+    "Production volumes",
+    "Availability",
+    "Stock levels",
+    "Lead times",
+    "Shipping times",
+    "Shipping costs",
+    "Defect rates",
+]
+
+# Key under which the grand totals (the empty grouping set) are returned
+TOTAL = "__total__"
+
+ROW_COUNT = "row_count"
+
+
+def build_query(relation, where=""):
+    # One GROUPING SETS query computes every chart's grouping in a single scan
+    keys = ", ".join(quote(d) for d in DIMENSIONS)
+    flags = ", ".join(f"GROUPING({quote(d)}) AS g{i}" for i, d in enumerate(DIMENSIONS))
+    sums = ", ".join(f"SUM({quote(m)}) AS {quote('sum_' + m)}" for m in MEASURES)
+    sets = ", ".join(f"({quote(d)})" for d in DIMENSIONS) + ", ()"
+    return (
+        f"SELECT {keys}, {flags}, {sums}, COUNT(*) AS {ROW_COUNT} "
+        f"FROM {relation}{where} GROUP BY GROUPING SETS ({sets})"
+    )
+
+
+def _split(result):
+    # Turn the stacked GROUPING SETS result into one frame per grouping key
+    flags = result[[f"g{i}" for i in range(len(DIMENSIONS))]].to_numpy()
+    value_columns = [f"sum_{m}" for m in MEASURES] + [ROW_COUNT]
+    partials = {}
+    for i, dimension in enumerate(DIMENSIONS):
+        rows = result[flags[:, i] == 0]
+        partials[dimension] = rows[[dimension] + value_columns].reset_index(drop=True)
+    partials[TOTAL] = result[flags.all(axis=1)][value_columns].reset_index(drop=True)
+    return partials
+
+
+def compute_partials(source, con=None, where="", params=None):
+    # Per-group sums and counts for every grouping key, in one pass over the
+    # source: either a pandas frame or the name of a table on con, optionally
+    # restricted by a parameterized WHERE clause
+    if isinstance(source, str):
+        return _split(query(con, build_query(source, where), params))
+    con = con if con is not None else duckdb.connect()
+    con.register("_partials_source", source)
+    try:
+        return _split(con.execute(build_query("_partials_source")).df())
+    finally:
+        con.unregister("_partials_source")
+
+
+def finalize(partials):
+    # Expose sums under the measure's column name and means next to them
+    aggregates = {}
+    for key, frame in partials.items():
+        out = frame.copy()
+        count = out[ROW_COUNT]
+        for measure in MEASURES:
+            total = out.pop(f"sum_{measure}").astype(float)
+            if measure == key:
+                # Summing the grouping key over its own groups is meaningless
+                continue
+            out[measure] = total
+            out[f"{measure} (mean)"] = total / count
+        aggregates[key] = out
+    return aggregates
+
+
+def compute_aggregates(source, con=None, where="", params=None):
+    return finalize(compute_partials(source, con, where, params))
+
+
+def merge_partials(left, right):
+    # Fold two sets of partial aggregates into one; sums and counts are
+    # additive, so merging costs time proportional to the number of groups
+    merged = {}
+    for key in left:
+        stacked = pd.concat([left[key], right[key]], ignore_index=True)
+        if key == TOTAL:
+            merged[key] = stacked.sum().to_frame().T
+        else:
+            merged[key] = stacked.groupby(key, dropna=False, observed=True, sort=False).sum().reset_index()
+    return merged
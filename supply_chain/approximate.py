@@ -0,0 +1,128 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from supply_chain.filters import FILTER_COLUMNS
+from supply_chain.schema import quote
+
+# Measures estimated for the KPI indicators
+ESTIMATED_MEASURES = ["Revenue generated", "Order quantities", "Stock levels", "Lead times"]
+
+# Columns kept in the sample: everything the estimates and the global filters read
+SAMPLE_COLUMNS = list(dict.fromkeys(FILTER_COLUMNS + ["SKU"] + ESTIMATED_MEASURES))
+
+# Rows the sample holds, whatever the table size
+SAMPLE_ROWS = 100_000
+
+# Normal quantile for a 95% confidence interval
+Z = 1.96
+
+SEED = 42
+
+# Name the sample is queried under
+SAMPLE = "_sample"
+
+
+def merge_sample(sample, rows, chunk, rng, sample_rows=SAMPLE_ROWS):
+    # Uniform sample of sample_rows rows (all of them when there are fewer)
+    # from the rows sample was drawn from plus chunk, where sample is a
+    # uniform sample of rows rows. The number taken from chunk follows the
+    # hypergeometric law, so the result is again a simple random sample and
+    # the sample can be kept up to date as rows are appended.
+    chunk = chunk[SAMPLE_COLUMNS]
+    if sample is None or rows + len(chunk) <= sample_rows:
+        return pd.concat([sample, chunk], ignore_index=True)
+    taken = rng.hypergeometric(len(chunk), rows, sample_rows)
+    keep = np.sort(rng.choice(len(sample), sample_rows - taken, replace=False))
+    take = np.sort(rng.choice(len(chunk), taken, replace=False))
+    return pd.concat([sample.iloc[keep], chunk.iloc[take]], ignore_index=True)
+
+
+def _domain_sums(con, where, params, group_by=None):
+    # Sample sums and sums of squares of each measure over the sampled rows
+    # matching where, overall or per group_by value. Measures are cast to
+    # DOUBLE first: a sample read from the Parquet cache keeps its downcast
+    # integer types, whose squares overflow.
+    def value(name):
+        return f"CAST({quote(name)} AS DOUBLE)"
+
+    sums = ", ".join(
+        f"SUM({value(name)}) AS {quote('s_' + name)}, SUM({value(name)} * {value(name)}) AS {quote('q_' + name)}"
+        for name in ESTIMATED_MEASURES
+    )
+    if group_by is None:
+        return con.execute(f"SELECT {sums}, COUNT(*) AS n FROM {SAMPLE}{where}", params).df()
+    key = quote(group_by)
+    return con.execute(f"SELECT {key}, {sums}, COUNT(*) AS n FROM {SAMPLE}{where} GROUP BY {key}", params).df()
+
+
+def _estimate(sums, sampled, rows):
+    # Totals of each domain (the filtered rows, or one group of them) from a
+    # simple random sample of sampled out of rows rows. Each sampled row
+    # stands for rows / sampled rows, and the variance of a domain total is
+    # rows^2 * (1 - sampled / rows) / sampled * s^2, with s^2 the sample
+    # variance of the measure taken as zero outside the domain.
+    weight = rows / sampled
+    variance_factor = rows ** 2 * (1.0 - sampled / rows) / sampled / max(sampled - 1, 1)
+
+    def variance(total, squares):
+        return (squares - total ** 2 / sampled).clip(lower=0) * variance_factor
+
+    columns = {}
+    for name in ESTIMATED_MEASURES:
+        total = sums[f"s_{name}"].fillna(0).astype(float)
+        columns[name] = total * weight
+        columns[f"{name} variance"] = variance(total, sums[f"q_{name}"].fillna(0).astype(float))
+    count = sums["n"].astype(float)
+    columns["rows"] = count * weight
+    columns["rows variance"] = variance(count, count)
+    columns["sample rows"] = count
+    return pd.DataFrame(columns, index=sums.index)
+
+
+def _with_intervals(estimates):
+    # Replace variances by 95% confidence bounds
+    out = pd.DataFrame(index=estimates.index)
+    for name in ESTIMATED_MEASURES + ["rows"]:
+        half_width = Z * np.sqrt(estimates[f"{name} variance"])
+        out[name] = estimates[name]
+        out[f"{name} low"] = estimates[name] - half_width
+        out[f"{name} high"] = estimates[name] + half_width
+    out["sample rows"] = estimates["sample rows"]
+    return out
+
+
+def _distinct(con, where, params, sampled, rows, column="SKU"):
+    # Distinct values of column from its frequencies in the sample: values
+    # seen more than once are counted as they are, and each value seen once
+    # stands for rows / sampled values, as SKUs are near-unique keys
+    counts = con.execute(
+        f"SELECT COUNT(*) FILTER (WHERE n = 1) AS once, COUNT(*) AS distinct_values "
+        f"FROM (SELECT COUNT(*) AS n FROM {SAMPLE}{where} GROUP BY {quote(column)})",
+        params,
+    ).fetchone()
+    once, distinct_values = counts
+    return int(round(once * rows / sampled + distinct_values - once))
+
+
+def estimate_totals(sample, rows, where="", params=None):
+    # Fast-preview estimates of the KPI totals, overall and per product type,
+    # each with a 95% confidence interval, plus an estimate of distinct SKUs,
+    # from a uniform sample of the rows rows of the dataset. Only the sample
+    # is read, so the cost does not grow with the table.
+    sampled = len(sample)
+    con = duckdb.connect()
+    con.register(SAMPLE, sample)
+    try:
+        totals = _estimate(_domain_sums(con, where, params or []), sampled, rows)
+        by_product = _domain_sums(con, where, params or [], "Product type")
+        by_product = _estimate(by_product, sampled, rows).set_index(by_product["Product type"])
+        distinct_skus = _distinct(con, where, params or [], sampled, rows)
+    finally:
+        con.close()
+    return {
+        "rate": sampled / rows,
+        "totals": _with_intervals(totals).iloc[0],
+        "by_product": _with_intervals(by_product).reset_index(),
+        "distinct_skus": distinct_skus,
+    }
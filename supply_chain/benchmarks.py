@@ -0,0 +1,213 @@
+import multiprocessing
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from supply_chain import figures
+from supply_chain.aggregations import TOTAL, compute_aggregates
+from supply_chain.database import TABLE, connect
+from supply_chain.forest import CompiledForest, export_forest
+from supply_chain.ingest import CACHE_DIR, cache_paths, ensure_cache, load_frame, read_csv
+from supply_chain.prediction import predict_frame
+from supply_chain.streaming import stream_partials
+from supply_chain.training import build_preprocessor, encode_cached, fit_encoded, split_features
+
+# Rows the model is fitted on at most; forests do not scale to the largest sizes
+MAX_FIT_ROWS = 100_000
+# Rows of the small model used by the batch predict case
+PREDICT_MODEL_ROWS = 1_000
+# Seconds between resident memory samples while a case runs
+RSS_SAMPLE_INTERVAL = 0.005
+
+
+def _rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb():
+    # Resident memory right now, from /proc on Linux; elsewhere only the
+    # process peak is available, which includes setup
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return _rss_mb()
+
+
+def _sample_rss(stop, peak):
+    while not stop.wait(RSS_SAMPLE_INTERVAL):
+        peak[0] = max(peak[0], _current_rss_mb())
+
+
+def pandas_aggregates(df):
+    # The per-chart groupbys app.py used to run, one scan each
+    return [
+        df["Revenue generated"].sum(),
+        df["Order quantities"].sum(),
+        df["Availability"].sum(),
+        df.groupby("Product type")["Revenue generated"].sum(),
+        df.groupby("Location")["Revenue generated"].sum(),
+        df.groupby("Product type").agg(Price=("Price", "sum"), Manufacturing_costs=("Manufacturing costs", "sum")),
+        df.groupby("Product type").agg(Revenue=("Revenue generated", "sum"), Cost=("Costs", "sum")),
+        df[["Stock levels", "Lead times"]].sum(),
+        df.groupby("Product type")["Manufacturing costs"].sum(),
+        df.groupby("Production volumes")["Manufacturing costs"].sum(),
+        df.groupby("Inspection results")["Manufacturing costs"].sum(),
+        df.groupby("Inspection results")["Defect rates"].sum(),
+        df.groupby("Inspection results")["Defect rates"].mean(),
+        df.groupby("Transportation modes")["Order quantities"].sum(),
+        df["Transportation modes"].value_counts(),
+        df.groupby("Transportation modes")[["Shipping times", "Lead times"]].mean(),
+        df.groupby("Product type")["Lead times"].mean(),
+        df.groupby("Shipping carriers")["Shipping costs"].sum(),
+        df.groupby("Transportation modes")["Shipping costs"].sum(),
+        df.groupby("Location")["Production volumes"].sum(),
+        df.groupby("Location")["Order quantities"].sum(),
+    ]
+
+
+def build_all_figures(aggregates):
+    # Every figure the dashboard sections build, without the figure cache
+    totals = aggregates[TOTAL].iloc[0]
+    return [
+        figures.total_revenue_indicator(totals["Revenue generated"]),
+        figures.total_orders_indicator(totals["Order quantities"]),
+        figures.total_availability_indicator(totals["Availability"]),
+        figures.revenue_by_product_bar(aggregates["Product type"]),
+        figures.revenue_by_location_pie(aggregates["Location"]),
+        figures.price_vs_costs_bar(aggregates["Product type"]),
+        figures.profitability_bar(aggregates["Product type"]),
+        figures.stock_levels_gauge(totals["Stock levels"], totals["Lead times"]),
+        figures.lead_times_gauge(totals["Stock levels"], totals["Lead times"]),
+        figures.manufacturing_costs_bar(aggregates["Product type"]),
+        figures.costs_vs_volumes_scatter(aggregates["Production volumes"]),
+        figures.costs_by_inspection_pie(aggregates["Inspection results"]),
+        figures.defect_rates_sunburst(aggregates["Inspection results"]),
+        figures.orders_by_mode_sunburst(aggregates["Transportation modes"]),
+        figures.mode_frequency_pie(aggregates["Transportation modes"]),
+        figures.lead_vs_shipping_line(aggregates["Transportation modes"]),
+        figures.lead_time_by_product_bar(aggregates["Product type"]),
+        figures.shipping_costs_by_carrier_bar(aggregates["Shipping carriers"]),
+        figures.shipping_costs_by_mode_bar(aggregates["Transportation modes"]),
+        figures.production_by_location_treemap(aggregates["Location"]),
+        figures.orders_by_location_bar(aggregates["Location"]),
+    ]
+
+
+def _clear_cache(csv_path):
+    for path in cache_paths(csv_path):
+        path.unlink(missing_ok=True)
+
+
+def _fit(df):
+    features, target, categorical_cols, numerical_cols = split_features(df)
+    preprocessor = build_preprocessor(categorical_cols, numerical_cols)
+    return fit_encoded(preprocessor, preprocessor.fit_transform(features), target, n_jobs=-1)[0]
+
+
+def _encode_cached(df, csv_path):
+    # The training script's path: the design matrix comes from the encoding cache
+    features, target, categorical_cols, numerical_cols = split_features(df)
+    preprocessor = build_preprocessor(categorical_cols, numerical_cols)
+    fitted, X_encoded = encode_cached(preprocessor, features, Path(csv_path).parent / CACHE_DIR)
+    return fitted, X_encoded, target
+
+
+def _compile(df, csv_path):
+    # The batch predict case's model, exported next to the data and loaded back
+    path = Path(csv_path).with_suffix(".forest")
+    export_forest(_fit(df), path)
+    return CompiledForest(path)
+
+
+# Each case is (setup, timed run); setup is excluded from the wall time
+CASES = {
+    "load_csv": (lambda path: path, lambda path: pd.read_csv(path)),
+    "load_csv_pinned_dtypes": (lambda path: path, lambda path: read_csv(path)),
+    "build_parquet_cache": (lambda path: _clear_cache(path) or path, ensure_cache),
+    "load_parquet": (lambda path: ensure_cache(path) and path, load_frame),
+    "aggregate_pandas_groupbys": (lambda path: pd.read_csv(path), pandas_aggregates),
+    "aggregate_duckdb_frame": (lambda path: pd.read_csv(path), compute_aggregates),
+    "aggregate_duckdb_table": (connect, lambda con: compute_aggregates(TABLE, con)),
+    "aggregate_streaming": (lambda path: path, stream_partials),
+    "build_figures": (lambda path: compute_aggregates(load_frame(path)), build_all_figures),
+    "model_fit": (lambda path: load_frame(path).head(MAX_FIT_ROWS), _fit),
+    "model_fit_cached_encoding": (
+        lambda path: _encode_cached(load_frame(path).head(MAX_FIT_ROWS), path),
+        lambda state: fit_encoded(*state, n_jobs=-1),
+    ),
+    "model_batch_predict": (
+        lambda path: (load_frame(path), _fit(load_frame(path).head(PREDICT_MODEL_ROWS))),
+        lambda state: predict_frame(*state),
+    ),
+    "model_compiled_predict": (
+        lambda path: (load_frame(path), _compile(load_frame(path).head(PREDICT_MODEL_ROWS), path)),
+        lambda state: predict_frame(*state),
+    ),
+}
+
+
+def _run_case(case, csv_path, results):
+    # Peak memory of the timed run is sampled by a thread started after setup,
+    # so memory setup needed and released again is not counted
+    setup, run = CASES[case]
+    state = setup(csv_path)
+    setup_peak = _rss_mb()
+    before = _current_rss_mb()
+    peak, stop = [before], threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, peak), daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    run(state)
+    seconds = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+    peak[0] = max(peak[0], _current_rss_mb())
+    results.put({"seconds": seconds, "peak_rss_mb": peak[0], "run_rss_mb": peak[0] - before,
+                 "setup_peak_rss_mb": setup_peak})
+
+
+def run_case(case, csv_path, timeout=None):
+    # Run one case in a fresh process, so peak memory is not inherited from
+    # earlier cases
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(case, str(csv_path), results))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        return {"error": "timeout"}
+    if process.exitcode != 0:
+        return {"error": f"exit code {process.exitcode}"}
+    return results.get()
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "machine": platform.machine(),
+            "cpus": multiprocessing.cpu_count()}
+
+
+def run_benchmarks(datasets, cases=None, timeout=None, report=print):
+    # Time every case on every (rows, csv_path) dataset
+    results = []
+    for rows, csv_path in datasets:
+        for case in cases or CASES:
+            result = {"case": case, "rows": rows, **run_case(case, csv_path, timeout)}
+            report(result)
+            results.append(result)
+        shutil.rmtree(Path(csv_path).parent / CACHE_DIR, ignore_errors=True)
+    return results
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pandas as pd
+
+from supply_chain.database import TABLE, query
+from supply_chain.ingest import CACHE_DIR
+from supply_chain.schema import quote
+
+# Dimensions the cube is precomputed over; every subset of them is a
+# grouping set, so any drill-down path is answered by lookup
+CUBE_DIMENSIONS = [
+    "Product type",
+    "Location",
+    "Transportation modes",
+    "Shipping carriers",
+    "Inspection results",
+    "Routes",
+    "Supplier name",
+]
+
+CUBE_MEASURES = [
+    "Revenue generated",
+    "Costs",
+    "Manufacturing costs",
+    "Shipping costs",
+    "Order quantities",
+    "Defect rates",
+]
+
+GROUPING_ID = "grouping_id"
+ROW_COUNT = "row_count"
+
+
+def cube_path(csv_path, version):
+    # The cube of csv_path at version, its (mtime_ns, size) when the cube was built
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / f"{csv_path.stem}.cube-{version[0]}-{version[1]}.parquet"
+
+
+def grouping_id(dimensions):
+    # DuckDB's GROUPING_ID sets a bit for every dimension that is rolled up,
+    # with the first dimension as the most significant bit
+    count = len(CUBE_DIMENSIONS)
+    return sum(1 << (count - 1 - i) for i, name in enumerate(CUBE_DIMENSIONS) if name not in dimensions)
+
+
+def build_cube(con):
+    # Sums and counts of the main measures over all subsets of the dimensions
+    keys = ", ".join(quote(name) for name in CUBE_DIMENSIONS)
+    sums = ", ".join(f"SUM({quote(name)}) AS {quote(name)}" for name in CUBE_MEASURES)
+    cube = query(
+        con,
+        f"SELECT {keys}, GROUPING_ID({keys}) AS {GROUPING_ID}, {sums}, COUNT(*) AS {ROW_COUNT} "
+        f"FROM {TABLE} GROUP BY CUBE ({keys})",
+    )
+    # Dimension values repeat heavily across grouping sets; store them as categoricals
+    for name in CUBE_DIMENSIONS:
+        cube[name] = cube[name].astype("category")
+    cube[GROUPING_ID] = cube[GROUPING_ID].astype("int16")
+    cube[ROW_COUNT] = cube[ROW_COUNT].astype("int64")
+    return cube
+
+
+def save_cube(cube, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging_path = path.with_suffix(".tmp")
+    cube.to_parquet(staging_path, index=False)
+    staging_path.replace(path)
+
+
+def load_cube(path):
+    return pd.read_parquet(path, memory_map=True)
+
+
+def cached_cube(csv_path, version, con_factory):
+    # The cube of csv_path at version, read back when an earlier process saved
+    # it; otherwise built on the connection from con_factory and saved, and
+    # cubes of other versions are removed
+    path = cube_path(csv_path, version)
+    if path.exists():
+        return load_cube(path)
+    cube = build_cube(con_factory())
+    save_cube(cube, path)
+    for stale in path.parent.glob(f"{Path(csv_path).stem}.cube-*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return cube
+
+
+def lookup(cube, by, filters=()):
+    # Answer a group-by over `by`, restricted to `filters` (pairs of column and
+    # allowed values), from the smallest precomputed grouping set that covers
+    # both; no raw rows are scanned
+    filter_columns = [column for column, _ in filters]
+    unknown = [name for name in list(by) + filter_columns if name not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Not cube dimensions: {unknown}")
+
+    rows = cube[cube[GROUPING_ID] == grouping_id(set(by) | set(filter_columns))]
+    for column, values in filters:
+        rows = rows[rows[column].isin(values)]
+
+    value_columns = CUBE_MEASURES + [ROW_COUNT]
+    if by:
+        result = rows.groupby(list(by), observed=True)[value_columns].sum().reset_index()
+    else:
+        result = rows[value_columns].sum().to_frame().T
+    for name in CUBE_MEASURES:
+        result[f"{name} (mean)"] = result[name] / result[ROW_COUNT]
+    return result
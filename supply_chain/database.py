@@ -0,0 +1,49 @@
+import duckdb
+
+from supply_chain import profiling
+from supply_chain.ingest import ensure_cache
+from supply_chain.schema import COLUMN_TYPES, quote
+
+# Name of the native table the dataset is loaded into
+TABLE = "supply_chain"
+
+
+def _csv_columns():
+    entries = ", ".join(f"'{name}': '{kind}'" for name, kind in COLUMN_TYPES.items())
+    return "{" + entries + "}"
+
+
+def connect(csv_path, database=":memory:", materialize=True):
+    # Load the dataset once into a typed columnar table; queries then run
+    # against that table instead of re-scanning a pandas frame on every call.
+    # Files too large to hold in memory are exposed as a view over the CSV.
+    con = duckdb.connect(database)
+    if not materialize:
+        path = str(csv_path).replace("'", "''")
+        con.execute(
+            f"CREATE OR REPLACE VIEW {TABLE} AS SELECT * FROM read_csv('{path}', header=true, "
+            f"auto_detect=false, columns={_csv_columns()})"
+        )
+        return con
+
+    columns = ", ".join(f"{quote(name)} {kind}" for name, kind in COLUMN_TYPES.items())
+    select = ", ".join(f"CAST({quote(name)} AS {kind})" for name, kind in COLUMN_TYPES.items())
+    con.execute(f"CREATE OR REPLACE TABLE {TABLE} ({columns})")
+    con.execute(
+        f"INSERT INTO {TABLE} SELECT {select} FROM read_parquet(?)",
+        [str(ensure_cache(csv_path))],
+    )
+    return con
+
+
+def query(con, sql, params=None):
+    # Run a prepared statement on a cursor of its own, so concurrent sessions
+    # can share one connection safely
+    cursor = con.cursor()
+    try:
+        profiler = profiling.current()
+        if profiler is not None:
+            return profiler.run_query(cursor, sql, params or [])
+        return cursor.execute(sql, params or []).df()
+    finally:
+        cursor.close()
@@ -0,0 +1,38 @@
+from supply_chain.database import TABLE, query
+from supply_chain.schema import COLUMNS, quote
+
+# Rows serialized per explorer page
+PAGE_SIZE = 50
+
+
+def _where(filter_column, filter_text):
+    # Case-insensitive substring match on one column, pushed down to DuckDB
+    if not filter_column or not filter_text:
+        return "", []
+    if filter_column not in COLUMNS:
+        raise ValueError(f"Unknown column: {filter_column}")
+    return f" WHERE CAST({quote(filter_column)} AS VARCHAR) ILIKE ?", [f"%{filter_text}%"]
+
+
+def count_rows(con, filter_column=None, filter_text=None):
+    where, params = _where(filter_column, filter_text)
+    return int(query(con, f"SELECT COUNT(*) AS n FROM {TABLE}{where}", params)["n"][0])
+
+
+def fetch_page(con, columns=None, page=0, page_size=PAGE_SIZE, sort_by=None, descending=False,
+               filter_column=None, filter_text=None):
+    # Fetch one page of rows with sorting, filtering and column projection
+    # done server side, so only the visible rows are ever materialized
+    columns = columns or COLUMNS
+    unknown = [name for name in columns + ([sort_by] if sort_by else []) if name not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}")
+
+    where, params = _where(filter_column, filter_text)
+    order = ""
+    if sort_by:
+        # SKU breaks ties so pages stay stable when the sort key repeats
+        order = f" ORDER BY {quote(sort_by)} {'DESC' if descending else 'ASC'}, {quote('SKU')}"
+    select = ", ".join(quote(name) for name in columns)
+    sql = f"SELECT {select} FROM {TABLE}{where}{order} LIMIT ? OFFSET ?"
+    return query(con, sql, params + [page_size, page * page_size])
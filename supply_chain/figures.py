@@ -0,0 +1,777 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from supply_chain import profiling
+
+# Maximum number of built figures kept in memory
+FIGURE_CACHE_SIZE = 128
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def content_hash(*args):
+    # Hash builder inputs by content, so equal aggregates map to the same key
+    # no matter which session or rerun produced them
+    digest = hashlib.sha1()
+    for arg in args:
+        if isinstance(arg, pd.DataFrame):
+            digest.update(repr(list(arg.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(arg, index=False).to_numpy().tobytes())
+        else:
+            digest.update(repr(arg).encode())
+    return digest.hexdigest()
+
+
+def cached_figure(builder, *args):
+    # Build a figure through an LRU cache of built figures, so an unchanged
+    # chart costs a lookup instead of Plotly Express processing. The figure is
+    # shared by every session and must be treated as read-only; st.plotly_chart
+    # only reads it, and an already validated Figure is the cheapest input it
+    # takes (a dict or JSON would be parsed and validated again).
+    key = (builder.__name__, content_hash(*args))
+    with _figure_cache_lock:
+        figure = _figure_cache.get(key)
+        if figure is not None:
+            _figure_cache.move_to_end(key)
+            return figure
+    with profiling.section(f"build {builder.__name__}"):
+        figure = builder(*args)
+    with _figure_cache_lock:
+        _figure_cache[key] = figure
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return figure
+
+
+def total_revenue_indicator(total_revenue):
+    # Total Revenue with improved styling
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode="number",
+        value=total_revenue,
+        title={"text": "Total Revenue", "font": {"size": 24, "color": "#ffffff"}},
+        number={"prefix": "$", "valueformat": ".2f", "font": {"size": 32, "color": "#4bc0c0"}},
+        domain={"x": [0, 1], "y": [0, 1]}
+    ))
+    
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=30, b=10),
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        font_color='white',
+    )
+
+    return fig
+
+
+def total_orders_indicator(total_orders_quantity):
+    # Total Orders Quantity with improved styling
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode="number",
+        value=total_orders_quantity,
+        title={"text": "Total Orders", "font": {"size": 24, "color": "#ffffff"}},
+        number={"valueformat": ",.0f", "font": {"size": 32, "color": "#9966ff"}},
+        domain={"x": [0, 1], "y": [0, 1]}
+    ))
+    
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=30, b=10),
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        font_color='white',
+    )
+
+    return fig
+
+
+def total_availability_indicator(total_availability):
+    # Total Availability with improved styling
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode="number",
+        value=total_availability,
+        title={"text": "Total Availability", "font": {"size": 24, "color": "#ffffff"}},
+        number={"font": {"size": 32, "color": "#36a2eb"}},
+        domain={"x": [0, 1], "y": [0, 1]}
+    ))
+    
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=30, b=10),
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        font_color='white',
+    )
+
+    return fig
+
+
+def revenue_by_product_bar(data):
+    # Revenue by Product Type - Bar chart with consistent colors
+    result = data[['Product type', 'Revenue generated']]
+    result = result.rename(columns={'Revenue generated': 'total_revenue'}).round(2)
+    result = result.sort_values(by='total_revenue', ascending=False)
+    
+    fig = px.bar(result, 
+            x='Product type', 
+            y='total_revenue', 
+            title='Revenue by Product Type',
+            labels={'total_revenue': 'Total Revenue ($)', 'Product type': 'Product Type'},
+            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb'])
+    
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Total Revenue ($)",
+        yaxis_tickprefix="$",
+        yaxis_tickformat=".2f",
+        margin=dict(l=40, r=40, t=50, b=40),
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+    )
+
+    return fig
+
+
+def revenue_by_location_pie(data):
+    # Revenue Distribution by Location - Pie chart with consistent colors
+    result = data[['Location', 'Revenue generated']]
+    result = result.rename(columns={'Revenue generated': 'total_revenue'}).round(2)
+    result = result.sort_values(by='total_revenue', ascending=False)
+    
+    fig = px.pie(result, 
+            values='total_revenue', 
+            names='Location', 
+            title='Revenue Distribution by Location',
+            labels={'total_revenue': 'Total Revenue ($)', 'Location': 'Location'},
+            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'])
+    
+    fig.update_layout(
+        margin=dict(l=40, r=40, t=50, b=40),
+        font=dict(size=14, color='white'),
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.3,
+            xanchor='center',
+            x=0.5
+        ),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig
+
+
+def price_vs_costs_bar(data):
+    # Cost vs Price Analysis - Grouped bar chart
+    price_costs_by_product = data[['Product type', 'Price', 'Manufacturing costs']]
+    price_costs_by_product = price_costs_by_product.rename(columns={'Manufacturing costs': 'Manufacturing_costs'})
+    
+    price_costs_by_product['Price'] = price_costs_by_product['Price'].round(2)
+    price_costs_by_product['Manufacturing_costs'] = price_costs_by_product['Manufacturing_costs'].round(2)
+    price_costs_by_product['Profit_margin'] = (price_costs_by_product['Price'] - price_costs_by_product['Manufacturing_costs']).round(2)
+    price_costs_by_product = price_costs_by_product.sort_values(by='Product type')
+    
+    fig = px.bar(price_costs_by_product, 
+            x='Product type', 
+            y=['Price', 'Manufacturing_costs'],
+            title='Price vs Manufacturing Costs by Product',
+            labels={'value': 'Amount ($)', 'Product type': 'Product Type', 'variable': 'Cost Type'},
+            color_discrete_sequence=['#4bc0c0', '#ff6384'],
+            barmode='group')
+    
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Amount ($)",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.3,
+            xanchor='center',
+            x=0.5
+        ),
+    )
+
+    return fig
+
+
+def profitability_bar(data):
+    # Overall Profitability - Bar chart with diverging colors
+    profitability_by_product = data[['Product type', 'Revenue generated', 'Costs']]
+    profitability_by_product = profitability_by_product.rename(columns={'Revenue generated': 'Revenue', 'Costs': 'Cost'})
+    
+    profitability_by_product['Profit'] = (profitability_by_product['Revenue'] - profitability_by_product['Cost']).round(2)
+    profitability_by_product = profitability_by_product.sort_values(by='Product type')
+    
+    fig = px.bar(profitability_by_product, 
+            x='Product type', 
+            y='Profit',
+            title='Overall Profitability by Product Type',
+            labels={'Profit': 'Profit ($)', 'Product type': 'Product Type'},
+            color='Profit',
+            color_continuous_scale=['#ff6384', '#ffb1c1', '#f8f9fa', '#9ee4d9', '#4bc0c0'],
+            color_continuous_midpoint=0)
+    
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Profit ($)",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+    )
+
+    return fig
+
+
+def stock_levels_gauge(total_stock_levels, total_lead_times):
+    
+    fig_stock_levels = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=total_stock_levels,
+        title={'text': "Total Stock Levels", 'font': {'size': 24, 'color': 'white'}},
+        gauge={
+            'axis': {'range': [0, max(total_stock_levels, total_lead_times) + 100], 'tickfont': {'color': 'white'}},
+            'bar': {'color': "#4bc0c0"},
+            'steps': [
+                {'range': [0, max(total_stock_levels, total_lead_times) / 3], 'color': "rgba(75, 192, 192, 0.2)"},
+                {'range': [max(total_stock_levels, total_lead_times) / 3, max(total_stock_levels, total_lead_times) * 2/3], 'color': "rgba(75, 192, 192, 0.4)"},
+                {'range': [max(total_stock_levels, total_lead_times) * 2/3, max(total_stock_levels, total_lead_times)], 'color': "rgba(75, 192, 192, 0.6)"}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 2},
+                'thickness': 0.75,
+                'value': total_stock_levels
+            }
+        },
+        number={'font': {'color': '#4bc0c0', 'size': 28}}
+    ))
+    
+    fig_stock_levels.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=60, b=20),
+        font=dict(color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig_stock_levels
+
+
+def lead_times_gauge(total_stock_levels, total_lead_times):
+    fig_lead_times = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=total_lead_times,
+        title={'text': "Total Lead Times", 'font': {'size': 24, 'color': 'white'}},
+        gauge={
+            'axis': {'range': [0, max(total_stock_levels, total_lead_times) + 100], 'tickfont': {'color': 'white'}},
+            'bar': {'color': "#9966ff"},
+            'steps': [
+                {'range': [0, max(total_stock_levels, total_lead_times) / 3], 'color': "rgba(153, 102, 255, 0.2)"},
+                {'range': [max(total_stock_levels, total_lead_times) / 3, max(total_stock_levels, total_lead_times) * 2/3], 'color': "rgba(153, 102, 255, 0.4)"},
+                {'range': [max(total_stock_levels, total_lead_times) * 2/3, max(total_stock_levels, total_lead_times)], 'color': "rgba(153, 102, 255, 0.6)"}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 2},
+                'thickness': 0.75,
+                'value': total_lead_times
+            }
+        },
+        number={'font': {'color': '#9966ff', 'size': 28}}
+    ))
+    
+    fig_lead_times.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=60, b=20),
+        font=dict(color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig_lead_times
+
+
+def manufacturing_costs_bar(data):
+    # Manufacturing Costs by Product Type - Bar chart with gradients
+    costs_by_product = data[['Product type', 'Manufacturing costs']].copy()
+    costs_by_product['Manufacturing costs'] = costs_by_product['Manufacturing costs'].round(2)
+    costs_by_product = costs_by_product.sort_values(by='Manufacturing costs', ascending=False)
+    
+    fig = px.bar(costs_by_product, 
+            x='Product type', 
+            y='Manufacturing costs', 
+            title='Manufacturing Costs by Product',
+            labels={'Manufacturing costs': 'Manufacturing Costs ($)', 'Product type': 'Product Type'},
+            color='Manufacturing costs',
+            color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'])
+    
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Manufacturing Costs ($)",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+    )
+
+    return fig
+
+
+def costs_vs_volumes_scatter(data):
+    # Manufacturing Costs vs Production Volumes - Scatter plot with trend line
+    production_summary = data[['Production volumes', 'Manufacturing costs']]
+    production_summary = production_summary.sort_values(by='Production volumes')
+    
+    fig = px.scatter(production_summary, 
+            x='Production volumes', 
+            y='Manufacturing costs', 
+            trendline='ols',
+            title='Manufacturing Costs vs Production Volumes',
+            labels={'Manufacturing costs': 'Manufacturing Costs ($)', 'Production volumes': 'Production Volumes'},
+            color_discrete_sequence=['#4bc0c0'])
+    
+    fig.update_traces(marker=dict(size=10))
+    
+    fig.update_layout(
+        xaxis_title="Production Volumes",
+        yaxis_title="Manufacturing Costs ($)",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+    
+    # Update trendline color
+    for trace in fig.data:
+        if trace.mode == 'lines':
+            trace.line.color = '#ff6384'
+
+    return fig
+
+
+def costs_by_inspection_pie(data):
+    # Manufacturing Costs by Inspection Results - Pie chart with modern colors
+    cost_summary = data[['Inspection results', 'Manufacturing costs']].copy()
+    total_costs = cost_summary['Manufacturing costs'].sum()
+    cost_summary['Percentage Contribution'] = (cost_summary['Manufacturing costs'] / total_costs * 100).round(2)
+    cost_summary['Manufacturing costs'] = cost_summary['Manufacturing costs'].astype(float).round(2)
+    cost_summary['Percentage Contribution'] = cost_summary['Percentage Contribution'].astype(float).round(2)
+    cost_summary = cost_summary.sort_values(by='Manufacturing costs', ascending=False)
+    
+    fig = px.pie(
+        cost_summary,
+        names='Inspection results',
+        values='Manufacturing costs',
+        title='Manufacturing Costs by Inspection Results',
+        color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'],
+        hole=0.4
+    )
+    
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hoverinfo='label+value+percent'
+    )
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        showlegend=False,
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig
+
+
+def defect_rates_sunburst(data):
+    # Defect Rates Analysis - Sunburst chart with modern colors
+    result = data[['Inspection results', 'Defect rates', 'Defect rates (mean)']]
+    result = result.rename(columns={'Defect rates': 'Defect rates_sum', 'Defect rates (mean)': 'Defect rates_avg'})
+    total_defect_rate = result['Defect rates_sum'].sum()
+    result['Percentage of Total Defect Rate'] = (result['Defect rates_sum'] / total_defect_rate * 100)
+    result = result.sort_values(by='Defect rates_sum', ascending=False)
+    
+    fig = px.sunburst(result, path=['Inspection results'], values='Defect rates_sum',
+                hover_data=['Percentage of Total Defect Rate', 'Defect rates_avg'],
+                title='Defect Rates by Inspection Results',
+                color='Defect rates_sum',
+                color_continuous_scale=['#4bc0c0', '#9966ff', '#36a2eb'])
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)', 
+        paper_bgcolor='rgba(30, 33, 48, 0.8)', 
+    )
+
+    return fig
+
+
+def orders_by_mode_sunburst(data):
+    # Transportation Modes Distribution - Sunburst chart
+    order_summary = data[['Transportation modes', 'Order quantities']]
+    order_summary = order_summary.sort_values(by='Transportation modes')
+    
+    fig = px.sunburst(
+        order_summary,
+        path=['Transportation modes'],
+        values='Order quantities',
+        title='Order Quantities by Transportation Mode',
+        color='Order quantities',
+        color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'],
+    )
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig
+
+
+def mode_frequency_pie(data):
+    # Transportation Modes Frequency - Pie chart with hole
+    mode_counts = data.set_index('Transportation modes')['row_count']
+    mode_counts = mode_counts.sort_values(ascending=False)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Pie(
+        labels=mode_counts.index,
+        values=mode_counts.values,
+        textinfo='percent',
+        marker_colors=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'],
+        textposition='inside',
+        hole=0.6
+    ))
+    
+    fig.update_layout(
+        title='Frequency of Transportation Modes',
+        annotations=[dict(text='Transport<br>Modes', x=0.5, y=0.5, font_size=15, showarrow=False, font_color='white')],
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        showlegend=True,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.3,
+            xanchor='center',
+            x=0.5
+        ),
+    )
+
+    return fig
+
+
+def lead_vs_shipping_line(data):
+    # Average Lead Time vs Shipping Time by Transportation Mode - Line chart
+    transport_summary = data[['Transportation modes', 'Shipping times (mean)', 'Lead times (mean)']]
+    transport_summary = transport_summary.rename(columns={'Shipping times (mean)': 'Shipping times', 'Lead times (mean)': 'Lead times'})
+    transport_summary = transport_summary.sort_values(by='Transportation modes')
+    
+    fig = px.line(transport_summary, 
+            x='Shipping times', 
+            y='Lead times', 
+            color='Transportation modes',
+            title='Lead Times vs. Shipping Times by Transport Mode',
+            labels={'Shipping times': 'Shipping Times (days)', 'Lead times': 'Lead Times (days)', 'Transportation modes': 'Transportation Mode'},
+            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'],
+            line_shape='spline')
+    
+    fig.update_traces(mode='lines+markers', marker=dict(size=10))
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        xaxis_title='Shipping Times (days)',
+        yaxis_title='Lead Times (days)',
+    )
+
+    return fig
+
+
+def lead_time_by_product_bar(data):
+    # Average Lead Time by Product Type - Bar chart with color gradient
+    average_lead_time_by_product = data[['Product type', 'Lead times (mean)']]
+    average_lead_time_by_product = average_lead_time_by_product.rename(columns={'Lead times (mean)': 'Lead times'})
+    average_lead_time_by_product['Average Lead Time'] = average_lead_time_by_product['Lead times'].round(2)
+    average_lead_time_by_product = average_lead_time_by_product.sort_values(by='Product type')
+    
+    fig = px.bar(average_lead_time_by_product, 
+            x='Product type', 
+            y='Average Lead Time',
+            title='Average Lead Time by Product Type',
+            labels={'Average Lead Time': 'Average Lead Time (days)', 'Product type': 'Product Type'},
+            color='Average Lead Time',
+            color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff'],
+            )
+    
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Average Lead Time (days)",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+    )
+
+    return fig
+
+
+def shipping_costs_by_carrier_bar(data):
+    # Shipping Costs by Carrier - Bar chart with categories
+    shipping_summary = data[['Shipping carriers', 'Shipping costs']]
+    shipping_summary = shipping_summary.sort_values(by='Shipping carriers')
+    
+    fig = px.bar(
+        shipping_summary,
+        x='Shipping carriers',
+        y='Shipping costs',
+        title='Distribution of Shipping Costs by Carrier',
+        labels={'Shipping carriers': 'Shipping Carriers', 'Shipping costs': 'Shipping Costs ($)'},
+        color='Shipping carriers',
+        color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384']
+    )
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        xaxis_title=None,
+        yaxis_title='Shipping Costs ($)',
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        showlegend=False,
+    )
+
+    return fig
+
+
+def shipping_costs_by_mode_bar(data):
+    # Shipping Costs by Transportation Mode - Bar chart with consistent colors
+    transportation_summary = data[['Transportation modes', 'Shipping costs']]
+    transportation_summary = transportation_summary.sort_values(by='Transportation modes')
+    
+    fig = px.bar(transportation_summary, 
+            x='Transportation modes', 
+            y='Shipping costs', 
+            title='Shipping Costs by Transportation Mode',
+            labels={'Shipping costs': 'Shipping Costs ($)', 'Transportation modes': 'Transportation Mode'},
+            color='Transportation modes',
+            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56'])
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        xaxis_title='Transportation Modes',
+        yaxis_title='Shipping Costs ($)',
+        showlegend=False,
+    )
+
+    return fig
+
+
+def production_by_location_treemap(data):
+    # Production Volumes by Location - Treemap with modern colors
+    location_summary = data[['Location', 'Production volumes']]
+    location_summary = location_summary.sort_values(by='Production volumes', ascending=False)
+    
+    fig = px.treemap(
+        location_summary,
+        path=['Location'],
+        values='Production volumes',
+        color='Production volumes',
+        color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff', '#ffcd56'],
+        title='Production Volumes by Location'
+    )
+    
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig
+
+
+def orders_by_location_bar(data):
+    # Order Quantities by Location - Bar chart with consistent colors
+    result = data[['Location', 'Order quantities']]
+    result = result.sort_values(by='Order quantities', ascending=False)
+    
+    fig = px.bar(result, x='Location', y='Order quantities',
+            title='Order Quantities by Location',
+            labels={'Location': 'Location', 'Order quantities': 'Total Order Quantities'},
+            color='Location',
+            color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'])
+    
+    fig.update_layout(
+        xaxis_title="Location",
+        yaxis_title="Total Order Quantities",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+        showlegend=False,
+    )
+
+    return fig
+
+
+def drilldown_chart(data, by, value):
+    # Drill-down view served from the cube: a bar chart for one dimension,
+    # a treemap when drilling across several
+    if len(by) == 1:
+        fig = px.bar(data.sort_values(by=value, ascending=False),
+                x=by[0],
+                y=value,
+                title=f'{value} by {by[0]}',
+                color=by[0],
+                color_discrete_sequence=['#4bc0c0', '#9966ff', '#36a2eb', '#ffcd56', '#ff6384'])
+        fig.update_layout(showlegend=False)
+    else:
+        fig = px.treemap(data,
+                path=list(by),
+                values=value,
+                color=value,
+                color_continuous_scale=['#36a2eb', '#4bc0c0', '#9966ff', '#ffcd56'],
+                title=f'{value} by {" › ".join(by)}')
+
+    fig.update_layout(
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+    )
+
+    return fig
+
+
+def estimated_revenue_bar(data):
+    # Fast-preview revenue by product type, with 95% confidence intervals as error bars
+    data = data.sort_values(by='Revenue generated', ascending=False)
+
+    fig = px.bar(data,
+            x='Product type',
+            y='Revenue generated',
+            error_y=data['Revenue generated high'] - data['Revenue generated'],
+            title='Estimated Revenue by Product Type',
+            labels={'Revenue generated': 'Estimated Revenue ($)', 'Product type': 'Product Type'},
+            color_discrete_sequence=['#4bc0c0'])
+
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Estimated Revenue ($)",
+        yaxis_tickprefix="$",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+    )
+
+    return fig
+
+
+def stockout_risk_bar(data):
+    # Simulated stock-out probability by product type, with the recommended safety stock on hover
+    data = data.sort_values(by='Stock-out probability', ascending=False)
+
+    fig = px.bar(data,
+            x='Product type',
+            y='Stock-out probability',
+            hover_data=['SKUs', 'Expected SKUs out of stock', 'Safety stock', 'Additional stock needed'],
+            title='Stock-out Probability by Product Type',
+            labels={'Stock-out probability': 'Stock-out Probability', 'Product type': 'Product Type'},
+            color='Stock-out probability',
+            color_continuous_scale=['#4bc0c0', '#ffcd56', '#ff6384'])
+
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Stock-out Probability",
+        yaxis_tickformat=".0%",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+        coloraxis_showscale=False,
+    )
+
+    return fig
+
+
+def demand_forecast_bar(data):
+    # Forecast units sold per step for every product type and location series
+    data = data.sort_values(by=['Product type', 'Location'])
+
+    fig = px.bar(data,
+            x='Location',
+            y='Forecast',
+            color='Product type',
+            barmode='group',
+            hover_data=['Points', 'Last', 'Alpha'],
+            title='Forecast Units Sold by Location and Product Type',
+            labels={'Forecast': 'Forecast Units Sold', 'Product type': 'Product Type'},
+            color_discrete_sequence=['#4bc0c0', '#ff6384', '#36a2eb', '#ffcd56', '#9966ff'])
+
+    fig.update_layout(
+        xaxis_title="Location",
+        yaxis_title="Forecast Units Sold",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.3,
+            xanchor='center',
+            x=0.5
+        ),
+    )
+
+    return fig
+
+
+def whatif_revenue_bar(data):
+    # Predicted revenue by product type before and after a what-if scenario
+    data = data.sort_values(by='Product type')
+
+    fig = px.bar(data,
+            x='Product type',
+            y=['Predicted revenue generated', 'Scenario revenue'],
+            title='Predicted Revenue: Current vs Scenario',
+            labels={'value': 'Predicted Revenue ($)', 'Product type': 'Product Type', 'variable': ''},
+            color_discrete_sequence=['#4bc0c0', '#ffcd56'],
+            barmode='group')
+
+    fig.update_layout(
+        xaxis_title="Product Type",
+        yaxis_title="Predicted Revenue ($)",
+        yaxis_tickprefix="$",
+        font=dict(size=14, color='white'),
+        plot_bgcolor='rgba(30, 33, 48, 0)',
+        paper_bgcolor='rgba(30, 33, 48, 0.8)',
+        bargap=0.2,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.3,
+            xanchor='center',
+            x=0.5
+        ),
+    )
+
+    return fig
@@ -0,0 +1,41 @@
+from supply_chain.schema import quote
+
+# Columns the dashboard can be sliced by
+FILTER_COLUMNS = [
+    "Product type",
+    "Location",
+    "Shipping carriers",
+    "Supplier name",
+    "Transportation modes",
+]
+
+
+def normalize(filters):
+    # Hashable, order-independent form of a filter selection, used as the
+    # memoization key; empty selections mean "no filter" and are dropped
+    return tuple(
+        (column, tuple(sorted(filters[column])))
+        for column in FILTER_COLUMNS
+        if filters.get(column)
+    )
+
+
+def where_clause(filters):
+    # Turn a normalized selection into a parameterized WHERE clause
+    predicates, params = [], []
+    for column, values in filters:
+        predicates.append(f"{quote(column)} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    if not predicates:
+        return "", []
+    return " WHERE " + " AND ".join(predicates), params
+
+
+def filter_options(aggregates):
+    # Distinct values per filter column, sorted for display. Every filter
+    # column is a grouping key of the aggregates, so no query over the rows
+    # is needed.
+    return {
+        column: sorted(aggregates[column][column].dropna().astype(str).unique().tolist())
+        for column in FILTER_COLUMNS
+    }
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from supply_chain.database import TABLE, query
+from supply_chain.ingest import CACHE_DIR
+from supply_chain.schema import quote
+
+# The dataset has no dates, so a series is the sequence of a key's rows in file order
+SERIES_KEYS = ["Product type", "Location"]
+TARGET = "Number of products sold"
+
+# Steps forecast ahead of each series
+HORIZON = 3
+
+# Series shorter than this get their mean as a flat forecast instead of a fitted model
+MIN_POINTS = 3
+
+# Series fitted per pool task
+BATCH_SERIES = 500
+
+# Bump to invalidate stored parameters when the model changes
+MODEL = "simple-exponential-smoothing-v1"
+
+
+def params_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / f"{csv_path.stem}.forecast.pkl"
+
+
+def load_series(con, keys=SERIES_KEYS, where="", params=None):
+    columns = ", ".join(quote(name) for name in keys + [TARGET])
+    return query(con, f"SELECT {columns} FROM {TABLE} {where}", params)
+
+
+def series_hash(values):
+    digest = hashlib.sha1(MODEL.encode())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def fit_series(values):
+    # Smoothing level and final level of a simple exponential smoothing fit;
+    # its forecast is flat at that level
+    if len(values) < MIN_POINTS:
+        return {"alpha": np.nan, "level": float(np.mean(values)), "sse": np.nan}
+    # Imported on first fit: statsmodels is slow to import and most callers only read stored parameters
+    from statsmodels.tsa.holtwinters import SimpleExpSmoothing
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = SimpleExpSmoothing(np.asarray(values, dtype=float), initialization_method="estimated").fit()
+    return {
+        "alpha": float(fit.params["smoothing_level"]),
+        "level": float(fit.forecast(1)[0]),
+        "sse": float(fit.sse),
+    }
+
+
+def _fit_batch(batch):
+    return [(key, fit_series(values)) for key, values in batch]
+
+
+def fit_missing(series, stored, batch_series=BATCH_SERIES, workers=None, pool=None):
+    # Fit every series whose hash has no stored parameters, in batches across a
+    # process pool (pool when given, else one started for this call). Returns
+    # the newly fitted parameters by hash.
+    missing = [(key, values) for key, values in series.items() if key not in stored]
+    batches = [missing[start:start + batch_series] for start in range(0, len(missing), batch_series)]
+    workers = min(workers or os.cpu_count(), len(batches))
+    if workers <= 1:
+        results = [_fit_batch(batch) for batch in batches]
+    elif pool is not None:
+        results = list(pool.map(_fit_batch, batches))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_batch, batches))
+    return {key: fitted for batch in results for key, fitted in batch}
+
+
+def forecast(data, path, keys=SERIES_KEYS, horizon=HORIZON, batch_series=BATCH_SERIES, workers=None,
+             prune=False, save=True, pool=None):
+    # Forecast TARGET for every series of data. Parameters are stored at path
+    # by series hash, so only series whose values changed are refit; with
+    # prune, parameters of series not in data are dropped, which keeps the
+    # store the size of the catalog on full runs. Without save the stored
+    # parameters are only read, and new fits live in the result alone.
+    # Returns one row per series and the number of series fitted.
+    path = Path(path)
+    stored = pd.read_pickle(path) if path.exists() else {}
+
+    grouped = data.groupby(keys, observed=True, sort=True)[TARGET]
+    names, hashes, points, last = [], [], [], []
+    series = {}
+    for name, values in grouped:
+        values = values.to_numpy(dtype=float)
+        key = series_hash(values)
+        series[key] = values
+        names.append(name)
+        hashes.append(key)
+        points.append(len(values))
+        last.append(values[-1])
+
+    fitted = fit_missing(series, stored, batch_series, workers, pool)
+    current = {**stored, **fitted}
+    if prune:
+        current = {key: current[key] for key in series}
+    if save and (fitted or len(current) != len(stored)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging_path = path.with_suffix(".tmp")
+        pd.to_pickle(current, staging_path)
+        os.replace(staging_path, path)
+
+    result = pd.DataFrame(names, columns=keys)
+    result["Points"] = points
+    result["Last"] = last
+    result["Alpha"] = [current[key]["alpha"] for key in hashes]
+    result["Forecast"] = [current[key]["level"] for key in hashes]
+    result[f"Forecast next {horizon}"] = result["Forecast"] * horizon
+    result["Refit"] = [key in fitted for key in hashes]
+    return result, len(fitted)
@@ -0,0 +1,283 @@
+import functools
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from supply_chain.ingest import file_digest
+
+COMPILED_PATH = "revenue_prediction_model.forest"
+
+MAGIC = b"SCFOREST1\n"
+
+# Arrays start on this boundary so every memory-mapped view is aligned
+ALIGN = 64
+
+# Rows evaluated at once; all trees advance together over a (trees, rows) array of node indices
+BATCH_ROWS = 1024
+
+# Low bits of a packed node word holding the split feature; the rest is the left child
+FEATURE_BITS = 16
+
+
+def _round_down(threshold):
+    # Largest float32 not above each float64 threshold. Trees compare float32
+    # inputs, and for a float32 x, x <= t holds exactly when x <= round_down(t).
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _level_order(tree):
+    # Node ids of tree in breadth-first order, children pushed in (left, right)
+    # pairs, so each internal node's right child directly follows its left one
+    left, right = tree.children_left, tree.children_right
+    levels = [np.array([0])]
+    while len(levels[-1]):
+        internal = levels[-1][left[levels[-1]] >= 0]
+        levels.append(np.column_stack([left[internal], right[internal]]).ravel())
+    return np.concatenate(levels)
+
+
+def _preprocessing(preprocessor):
+    # Imputation fills and one-hot categories of the training pipeline's ColumnTransformer
+    transformers = {name: (transformer, list(columns)) for name, transformer, columns in preprocessor.transformers_
+                    if name != "remainder"}
+    # Output columns follow the transformer order: numerical first, then the one-hot blocks
+    if list(transformers) != ["num", "cat"]:
+        raise ValueError(f"Unsupported preprocessor: {preprocessor!r}")
+
+    numerical, numerical_cols = transformers["num"]
+    categorical, categorical_cols = transformers["cat"]
+    imputer, encoder = categorical.named_steps["imputer"], categorical.named_steps["onehot"]
+    if encoder.drop_idx_ is not None or encoder.handle_unknown != "ignore":
+        raise ValueError(f"Unsupported encoder: {encoder!r}")
+    return {
+        "numerical": {"columns": numerical_cols, "fill": numerical.statistics_.tolist()},
+        "categorical": {
+            "columns": categorical_cols,
+            "fill": [str(value) for value in imputer.statistics_],
+            "categories": [[str(value) for value in categories] for categories in encoder.categories_],
+        },
+    }
+
+
+def model_source(model_path):
+    # Identity of a saved pipeline, recorded in the header of forests compiled from it
+    stat = os.stat(model_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_digest(model_path)}
+
+
+def export_forest(model, path=COMPILED_PATH, source=None):
+    # Flatten a fitted preprocessing + RandomForestRegressor pipeline into one
+    # file: a JSON header with the preprocessing and the model_source of the
+    # pipeline file, if any, then the nodes of all trees as contiguous arrays.
+    # Nodes are laid out so a right child follows its left sibling; each node's left child and split feature share one int64
+    # word, so a step costs one lookup of node data. Leaves are their own
+    # left child with an infinite threshold, so every tree can be advanced
+    # the same number of steps.
+    regressor = model.named_steps["regressor"]
+    if regressor.n_outputs_ != 1:
+        raise ValueError("Only single-output forests can be compiled")
+    if regressor.n_features_in_ >= 1 << FEATURE_BITS:
+        raise ValueError("Too many features to compile")
+
+    nodes, thresholds, values, roots = [], [], [], []
+    offset = 0
+    for estimator in regressor.estimators_:
+        tree = estimator.tree_
+        order = _level_order(tree)
+        position = np.empty(tree.node_count, dtype=np.int64)
+        position[order] = np.arange(tree.node_count)
+
+        leaf = tree.children_left[order] < 0
+        left = np.where(leaf, np.arange(tree.node_count), position[tree.children_left[order]]) + offset
+        feature = np.where(leaf, 0, tree.feature[order])
+        nodes.append((left << FEATURE_BITS) | feature)
+        thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+        values.append(tree.value[order, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+
+    arrays = {
+        "node": np.concatenate(nodes).astype(np.int64),
+        "threshold": _round_down(np.concatenate(thresholds)),
+        "value": np.concatenate(values).astype(np.float32),
+        "root": np.asarray(roots, dtype=np.int64),
+    }
+
+    header = {
+        "feature_names": [str(name) for name in model.feature_names_in_],
+        "n_features": int(regressor.n_features_in_),
+        "max_depth": int(max(estimator.tree_.max_depth for estimator in regressor.estimators_)),
+        **_preprocessing(model.named_steps["preprocessor"]),
+        "source": source,
+        "arrays": {},
+    }
+    position = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position += -(-array.nbytes // ALIGN) * ALIGN
+
+    encoded = json.dumps(header).encode()
+    start = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGN) * ALIGN
+
+    # Staged under a unique name, so concurrent exporters never write the same file
+    path = Path(path)
+    staging = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False)
+    try:
+        with staging as handle:
+            handle.write(MAGIC)
+            handle.write(len(encoded).to_bytes(8, "little"))
+            handle.write(encoded)
+            for name, array in arrays.items():
+                handle.seek(start + header["arrays"][name]["offset"])
+                handle.write(array.tobytes())
+        os.replace(staging.name, path)
+    except BaseException:
+        Path(staging.name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _codes(values, categories, fill):
+    # Position of each value in categories, -1 when unknown; missing values
+    # count as fill. Categorical columns are mapped through their categories.
+    index = pd.Index(categories)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(index.get_indexer(values.cat.categories.astype(str)), index.get_indexer([fill]))
+        return lookup[values.cat.codes.to_numpy()]
+    values = values.astype(object)
+    return index.get_indexer(values.where(values.notna(), fill).astype(str))
+
+
+def read_header(path):
+    # The JSON header of a compiled forest and the offset its arrays start at
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compiled forest")
+        length = int.from_bytes(handle.read(8), "little")
+        header = json.loads(handle.read(length))
+    return header, -(-(len(MAGIC) + 8 + length) // ALIGN) * ALIGN
+
+
+def compiled_from(path, model_path):
+    # Whether the forest at path was compiled from the pipeline now saved at
+    # model_path: a matching mtime and size is trusted, otherwise the content
+    # hash decides
+    if not os.path.exists(path):
+        return False
+    source = read_header(path)[0].get("source")
+    if source is None:
+        return False
+    stat = os.stat(model_path)
+    if (source["mtime_ns"], source["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return True
+    return source["sha256"] == file_digest(model_path)
+
+
+class CompiledForest:
+    # Predictor over an exported forest; tree arrays are memory-mapped, so
+    # loading costs a header read and pages are shared between processes
+
+    def __init__(self, path=COMPILED_PATH):
+        header, start = read_header(path)
+
+        self.feature_names_in_ = np.asarray(header["feature_names"], dtype=object)
+        self.n_features = header["n_features"]
+        self.max_depth = header["max_depth"]
+        self.numerical = header["numerical"]
+        self.categorical = header["categorical"]
+        for name, spec in header["arrays"].items():
+            array = np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                              offset=start + spec["offset"], shape=tuple(spec["shape"]))
+            setattr(self, name, array)
+
+        # Column of each numerical input and first column of each one-hot block
+        self.numerical_index = np.arange(len(self.numerical["columns"]))
+        sizes = [len(categories) for categories in self.categorical["categories"]]
+        self.categorical_offsets = len(self.numerical_index) + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+
+    def encode(self, df):
+        # The float32 design matrix the trees were trained on
+        X = np.zeros((len(df), self.n_features), dtype=np.float32)
+        numerical = df[self.numerical["columns"]].to_numpy(dtype=np.float64)
+        numerical = np.where(np.isnan(numerical), np.asarray(self.numerical["fill"]), numerical)
+        X[:, self.numerical_index] = numerical
+        self.encode_categorical(df, X)
+        return X
+
+    def encode_categorical(self, df, X, columns=None):
+        # Set the one-hot block of each categorical column (all of them, or
+        # only those in columns) in X, in place; unknown values stay all zero
+        rows = np.arange(len(df))
+        spec = self.categorical
+        for index, column in enumerate(spec["columns"]):
+            if columns is not None and column not in columns:
+                continue
+            codes = _codes(df[column], spec["categories"][index], spec["fill"][index])
+            offset = self.categorical_offsets[index]
+            X[rows, offset:offset + len(spec["categories"][index])] = 0
+            known = codes >= 0
+            X[rows[known], offset + codes[known]] = 1
+        return X
+
+    def column_index(self, column):
+        # Design-matrix column of a numerical input
+        return self.numerical["columns"].index(column)
+
+    def predict_encoded(self, X, batch_rows=BATCH_ROWS):
+        # Advance every (tree, row) pair one level per step and average the
+        # leaf values. Going right is the left child plus one, and a leaf is
+        # its own left child. Pairs that reached a leaf are set aside once
+        # they are half of those left, and the walk stops when all have, so
+        # the deep steps only touch the pairs still inside a tree.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        mask = (1 << FEATURE_BITS) - 1
+        node_words, thresholds = self.node.view(np.ndarray), self.threshold.view(np.ndarray)
+        trees = len(self.root)
+        predictions = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_rows):
+            batch = X[start:start + batch_rows]
+            flat = batch.ravel()
+            nodes = np.repeat(self.root, len(batch))
+            row_offsets = np.tile(np.arange(len(batch)) * self.n_features, trees)
+            pairs = np.arange(nodes.size)
+            leaves = np.empty(nodes.size, dtype=np.int64)
+            while True:
+                node = np.take(node_words, nodes)
+                left = node >> FEATURE_BITS
+                done = left == nodes
+                finished = np.count_nonzero(done)
+                if finished == nodes.size:
+                    leaves[pairs] = nodes
+                    break
+                if finished * 2 >= nodes.size:
+                    leaves[pairs[done]] = nodes[done]
+                    active = ~done
+                    node, left, nodes = node[active], left[active], nodes[active]
+                    row_offsets, pairs = row_offsets[active], pairs[active]
+                node &= mask
+                node += row_offsets
+                goes_right = np.take(flat, node) > np.take(thresholds, nodes)
+                nodes = np.add(left, goes_right, out=left)
+            values = np.take(self.value.view(np.ndarray), leaves).reshape(trees, len(batch))
+            predictions[start:start + batch_rows] = values.mean(axis=0, dtype=np.float64)
+        return predictions
+
+    def predict(self, df):
+        return self.predict_encoded(self.encode(df))
+
+
+def load_compiled(path=COMPILED_PATH):
+    # Cached per file state, so a re-exported forest is picked up
+    return _load_compiled(str(path), os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_compiled(path, mtime_ns):
+    return CompiledForest(path)
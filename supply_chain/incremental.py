@@ -0,0 +1,191 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from supply_chain.aggregations import DIMENSIONS, ROW_COUNT, TOTAL, compute_partials, merge_partials
+from supply_chain.approximate import SAMPLE_COLUMNS, SAMPLE_ROWS, SEED, merge_sample
+from supply_chain.ingest import CACHE_DIR, ensure_cache, read_csv
+from supply_chain.schema import quote
+from supply_chain.snapshot import SNAPSHOT_MEASURES, write_snapshot
+from supply_chain.streaming import CHUNK_ROWS
+
+# Bytes just before the consumed offset that must be unchanged for the file
+# to count as appended to rather than rewritten
+FINGERPRINT_BYTES = 64 * 1024
+
+
+class _BoundedReader(io.RawIOBase):
+    # Read-only view of a file between two byte offsets
+
+    def __init__(self, handle, start, end):
+        handle.seek(start)
+        self._handle = handle
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        count = self._handle.readinto(view)
+        self._remaining -= count
+        return count
+
+
+def state_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / f"{csv_path.stem}.partials.pkl"
+
+
+def sample_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / f"{csv_path.stem}.sample.pkl"
+
+
+def read_sample(csv_path):
+    # The uniform row sample kept by the last refresh and the number of rows
+    # it was drawn from, or None before the first refresh; csv_path itself is not read
+    path = sample_path(csv_path)
+    if not path.exists():
+        return None
+    stored = pd.read_pickle(path)
+    return stored["sample"], stored["rows"]
+
+
+def _stored_sample(csv_path):
+    path = sample_path(csv_path)
+    return pd.read_pickle(path) if path.exists() else None
+
+
+def _fingerprint(handle, offset):
+    start = max(0, offset - FINGERPRINT_BYTES)
+    handle.seek(start)
+    return hashlib.sha256(handle.read(offset - start)).hexdigest()
+
+
+def _complete_end(handle, size):
+    # Offset just past the last newline, so a row still being written is left
+    # for the next refresh
+    position = size
+    while position > 0:
+        start = max(0, position - FINGERPRINT_BYTES)
+        handle.seek(start)
+        block = handle.read(position - start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def _header(handle):
+    handle.seek(0)
+    line = handle.readline()
+    return len(line), pd.read_csv(io.BytesIO(line), nrows=0).columns.tolist()
+
+
+def _fold(handle, start, end, columns, partials, sample, chunk_rows):
+    # Fold the rows between start and end into the partials and the row sample
+    con = duckdb.connect()
+    rng = np.random.default_rng(end)
+    rows = 0 if partials is None else int(partials[TOTAL][ROW_COUNT].iloc[0])
+    reader = io.BufferedReader(_BoundedReader(handle, start, end))
+    for chunk in read_csv(reader, names=columns, header=None, chunksize=chunk_rows):
+        chunk_partials = compute_partials(chunk, con)
+        partials = chunk_partials if partials is None else merge_partials(partials, chunk_partials)
+        sample = merge_sample(sample, rows, chunk, rng)
+        rows += len(chunk)
+    con.close()
+    return partials, sample
+
+
+def _source_state(csv_path):
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _from_cache(csv_path, source):
+    # Partials and row sample of the whole file, computed by DuckDB over its
+    # Parquet cache, the columnar copy the dashboard's table is loaded from,
+    # so a rebuild shares that one parse of the CSV. None when the file
+    # changed from source while the cache was read.
+    relation = "read_parquet('{}')".format(str(ensure_cache(csv_path)).replace("'", "''"))
+    if _source_state(csv_path) != source:
+        return None
+    con = duckdb.connect()
+    try:
+        partials = compute_partials(relation, con)
+        columns = ", ".join(quote(name) for name in SAMPLE_COLUMNS)
+        sample = con.execute(
+            f"SELECT {columns} FROM {relation} USING SAMPLE reservoir({SAMPLE_ROWS} ROWS) REPEATABLE ({SEED})"
+        ).df()
+    finally:
+        con.close()
+    if sample.empty:
+        return None
+    return partials, sample
+
+
+def refresh(csv_path, chunk_rows=CHUNK_ROWS, materialize=True):
+    # Bring the stored partial aggregates up to date with csv_path and return
+    # them. Rows appended since the last refresh are folded in on their own;
+    # any other change to the file triggers a full rebuild, read from the
+    # Parquet cache unless materialize is off (files too large to convert).
+    path = state_path(csv_path)
+    state = pd.read_pickle(path) if path.exists() else None
+
+    source = _source_state(csv_path)
+    with open(csv_path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        end = _complete_end(handle, size)
+        header_end, columns = _header(handle)
+
+        appended = (
+            state is not None
+            and state["columns"] == columns
+            and state.get("dimensions") == DIMENSIONS
+            and state["offset"] <= end
+            and _fingerprint(handle, state["offset"]) == state["fingerprint"]
+        )
+        if appended and state["offset"] == end:
+            return state["partials"]
+        stored_sample = _stored_sample(csv_path) if appended else None
+        if stored_sample is not None and stored_sample["offset"] == state["offset"]:
+            partials, sample = _fold(handle, state["offset"], end, columns, state["partials"],
+                                     stored_sample["sample"], chunk_rows)
+        else:
+            # The cache covers the whole file, so it is only used when no row is half-written
+            rebuilt = _from_cache(csv_path, source) if materialize and end == size == source[1] else None
+            if rebuilt is not None:
+                partials, sample = rebuilt
+            else:
+                partials, sample = _fold(handle, header_end, end, columns, None, None, chunk_rows)
+
+        fingerprint = _fingerprint(handle, end)
+
+    if partials is None:
+        return None
+
+    totals = partials[TOTAL].iloc[0]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # The sample is replaced first and records the offset it covers; a state
+    # left behind by an interrupted refresh no longer matches it and is rebuilt
+    staging_path = sample_path(csv_path).with_suffix(".tmp")
+    pd.to_pickle({"offset": end, "rows": int(totals[ROW_COUNT]), "sample": sample}, staging_path)
+    os.replace(staging_path, sample_path(csv_path))
+    staging_path = path.with_suffix(".tmp")
+    pd.to_pickle(
+        {"columns": columns, "dimensions": DIMENSIONS, "offset": end, "fingerprint": fingerprint, "partials": partials},
+        staging_path,
+    )
+    os.replace(staging_path, path)
+
+    write_snapshot(csv_path, {name: totals[f"sum_{name}"] for name in SNAPSHOT_MEASURES}, totals[ROW_COUNT])
+    return partials
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from supply_chain.schema import COLUMN_TYPES
+from supply_chain.snapshot import CACHE_DIR, SNAPSHOT_MEASURES, write_snapshot
+
+# Text columns with few distinct values are stored as categoricals; SKU is
+# unique per row so it stays a plain string column
+CATEGORICAL_COLUMNS = [
+    name for name, kind in COLUMN_TYPES.items() if kind == "VARCHAR" and name != "SKU"
+]
+INTEGER_COLUMNS = [name for name, kind in COLUMN_TYPES.items() if kind == "INTEGER"]
+
+def cache_paths(csv_path):
+    csv_path = Path(csv_path)
+    cache_dir = csv_path.parent / CACHE_DIR
+    return cache_dir / f"{csv_path.stem}.parquet", cache_dir / f"{csv_path.stem}.meta.json"
+
+
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_csv(csv_path, **kwargs):
+    # Parse with pinned dtypes instead of letting pandas re-infer every column
+    dtypes = {name: "category" for name in CATEGORICAL_COLUMNS}
+    dtypes["SKU"] = "string"
+    return pd.read_csv(csv_path, dtype=dtypes, **kwargs)
+
+
+def downcast(df):
+    # Integers are narrowed to the smallest type that holds them; floats stay
+    # float64 so revenue and cost totals remain exact to the cent
+    for name in INTEGER_COLUMNS:
+        if name in df.columns:
+            df[name] = pd.to_numeric(df[name], downcast="integer")
+    return df
+
+
+def _source_state(csv_path):
+    stat = os.stat(csv_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def ensure_cache(csv_path):
+    # Return the Parquet cache for csv_path, rebuilding it only when the source
+    # changed: a matching mtime and size is trusted, otherwise the content hash
+    # decides whether the file really differs
+    parquet_path, meta_path = cache_paths(csv_path)
+    state = _source_state(csv_path)
+    meta = None
+    if parquet_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta["mtime_ns"] == state["mtime_ns"] and meta["size"] == state["size"]:
+            return parquet_path
+
+    digest = file_digest(csv_path)
+    if meta is None or meta["sha256"] != digest:
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        staging_path = parquet_path.with_suffix(".parquet.tmp")
+        frame = downcast(read_csv(csv_path))
+        frame.to_parquet(staging_path, index=False)
+        os.replace(staging_path, parquet_path)
+        write_snapshot(csv_path, frame[SNAPSHOT_MEASURES].sum(), len(frame))
+
+    meta_path.write_text(json.dumps({**state, "sha256": digest}))
+    return parquet_path
+
+
+def load_frame(csv_path, columns=None):
+    # Load the dataset through its columnar cache, memory-mapped
+    return pd.read_parquet(ensure_cache(csv_path), columns=columns, memory_map=True)
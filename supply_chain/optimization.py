@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+
+from supply_chain.database import TABLE, query
+from supply_chain.schema import quote
+
+# A lane is one carrier, mode and route combination SKUs can be shipped on
+LANE = ["Shipping carriers", "Transportation modes", "Routes"]
+
+# Extra days of expected shipping time a SKU may be moved onto
+TIME_SLACK = 0.0
+
+# Share by which a carrier may take on more SKUs than it ships today
+CAPACITY_SLACK = 0.1
+
+
+def lane_table(con, where="", params=None):
+    # Observed lanes with their SKU counts, mean of Shipping costs plus Costs
+    # per SKU and mean shipping time
+    keys = ", ".join(quote(name) for name in LANE)
+    return query(
+        con,
+        f"SELECT {keys}, COUNT(*) AS skus, "
+        f"AVG({quote('Shipping costs')} + {quote('Costs')}) AS cost, "
+        f"AVG({quote('Shipping times')}) AS time "
+        f"FROM {TABLE} {where} GROUP BY ALL ORDER BY {keys}",
+        params,
+    )
+
+
+def optimize_lanes(lanes, time_slack=TIME_SLACK, capacity_slack=CAPACITY_SLACK):
+    # Reassign SKUs between lanes to minimise total cost. SKUs on the same lane
+    # are interchangeable, so the LP works on lane-to-lane flows rather than on
+    # individual SKUs: each lane's SKUs must all be placed, only onto lanes
+    # whose expected shipping time is within time_slack of their current one,
+    # and no carrier may exceed its current SKU count by more than
+    # capacity_slack. The constraint matrix is a transportation problem, so the
+    # optimal flows are whole SKU counts. Returns one row per non-zero flow.
+    lanes = lanes.reset_index(drop=True)
+    cost = lanes['cost'].to_numpy(dtype=float)
+    time = lanes['time'].to_numpy(dtype=float)
+    demand = lanes['skus'].to_numpy(dtype=float)
+
+    # Variables are the allowed (current lane, new lane) pairs
+    source, target = np.nonzero(time[None, :] <= time[:, None] + time_slack)
+    variables = np.arange(len(source))
+
+    carriers, carrier_codes = np.unique(lanes['Shipping carriers'].astype(str), return_inverse=True)
+    capacity = np.floor(np.bincount(carrier_codes, weights=demand) * (1 + capacity_slack))
+
+    a_eq = sparse.csr_matrix((np.ones(len(variables)), (source, variables)), shape=(len(lanes), len(variables)))
+    a_ub = sparse.csr_matrix((np.ones(len(variables)), (carrier_codes[target], variables)),
+                             shape=(len(carriers), len(variables)))
+    result = linprog(cost[target], A_ub=a_ub, b_ub=capacity, A_eq=a_eq, b_eq=demand,
+                     bounds=(0, None), method="highs")
+    if not result.success:
+        raise RuntimeError(f"Lane optimization failed: {result.message}")
+
+    flows = np.rint(result.x).astype(np.int64)
+    used = flows > 0
+    current = lanes.loc[source[used], LANE].reset_index(drop=True)
+    recommended = lanes.loc[target[used], LANE].reset_index(drop=True)
+    plan = pd.concat([current.add_prefix("From "), recommended.add_prefix("To ")], axis=1)
+    plan["skus"] = flows[used]
+    plan["current cost"] = flows[used] * cost[source[used]]
+    plan["optimized cost"] = flows[used] * cost[target[used]]
+    plan["savings"] = plan["current cost"] - plan["optimized cost"]
+    plan["source"] = source[used]
+    plan["target"] = target[used]
+    return plan
+
+
+def summarize(plan):
+    current = float(plan["current cost"].sum())
+    optimized = float(plan["optimized cost"].sum())
+    moved = plan.loc[plan["source"] != plan["target"], "skus"].sum()
+    return {
+        "current cost": current,
+        "optimized cost": optimized,
+        "savings": current - optimized,
+        "savings share": (current - optimized) / current if current else 0.0,
+        "moved skus": int(moved),
+    }
+
@@ -0,0 +1,77 @@
+import functools
+import time
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from supply_chain.forest import load_compiled
+from supply_chain.ingest import downcast, read_csv
+
+MODEL_PATH = "revenue_prediction_model.joblib"
+TARGET = "Revenue generated"
+PREDICTION = "Predicted revenue generated"
+
+# Rows scored per batch; each batch is one vectorized predict call
+BATCH_ROWS = 100_000
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(path=MODEL_PATH, n_jobs=-1):
+    # Load the pipeline once per process, with its tree arrays memory-mapped,
+    # and let the forest predict on all cores; a compiled forest (.forest)
+    # is evaluated in vectorized NumPy instead
+    if Path(path).suffix == ".forest":
+        return load_compiled(path)
+    model = joblib.load(path, mmap_mode="r")
+    model.named_steps["regressor"].set_params(n_jobs=n_jobs)
+    return model
+
+
+def predict_frame(df, model=None):
+    # Score one batch of SKU rows; columns the model was not trained on are ignored
+    model = model if model is not None else load_model()
+    return model.predict(df[list(model.feature_names_in_)])
+
+
+def iter_batches(path, batch_rows=BATCH_ROWS):
+    # Read CSV or Parquet input in bounded batches
+    if Path(path).suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield downcast(batch.to_pandas())
+    else:
+        for chunk in read_csv(path, chunksize=batch_rows):
+            yield downcast(chunk)
+
+
+def predict_batches(batches, model=None):
+    # Yield SKU and predicted revenue for each batch as soon as it is scored
+    model = model if model is not None else load_model()
+    for batch in batches:
+        result = pd.DataFrame({"SKU": batch["SKU"].astype(str), PREDICTION: predict_frame(batch, model)})
+        yield result
+
+
+def score_file(input_path, output_path, batch_rows=BATCH_ROWS, model=None):
+    # Stream predictions for input_path into output_path (CSV or Parquet) and
+    # return the number of rows scored and the elapsed seconds
+    rows = 0
+    start = time.perf_counter()
+    writer = None
+    parquet_output = Path(output_path).suffix == ".parquet"
+    try:
+        for result in predict_batches(iter_batches(input_path, batch_rows), model):
+            if parquet_output:
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                result.to_csv(output_path, mode="a" if rows else "w", header=not rows, index=False)
+            rows += len(result)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows, time.perf_counter() - start
@@ -0,0 +1,78 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Profiler of the current script run; None when profiling is off, in which
+# case every hook below is a no-op
+_current = contextvars.ContextVar("profiler", default=None)
+
+
+class Profiler:
+    # Collects timings of nested sections and DuckDB queries for one run and
+    # emits each record as a structured log line
+
+    def __init__(self, explain=False):
+        self.explain = explain
+        self.records = []
+        self._depth = 0
+
+    def _record(self, **record):
+        self.records.append(record)
+        logger.info(json.dumps(record, default=str))
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self._record(kind="section", name=name, depth=self._depth, seconds=time.perf_counter() - start)
+
+    def run_query(self, cursor, sql, params):
+        start = time.perf_counter()
+        result = cursor.execute(sql, params).df()
+        seconds = time.perf_counter() - start
+        plan = None
+        if self.explain:
+            # EXPLAIN ANALYZE runs the query a second time, with per-operator timings
+            plan = "\n".join(row[-1] for row in cursor.execute("EXPLAIN ANALYZE " + sql, params).fetchall())
+        self._record(kind="query", name=" ".join(sql.split())[:120], depth=self._depth,
+                     seconds=seconds, rows=len(result), plan=plan)
+        return result
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.records, columns=["kind", "name", "depth", "seconds", "rows", "plan"])
+
+    def to_json_lines(self):
+        return "\n".join(json.dumps(record, default=str) for record in self.records)
+
+
+def activate(profiler):
+    return _current.set(profiler)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def section(name):
+    # Time a block under the active profiler, if any
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
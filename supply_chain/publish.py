@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from supply_chain.aggregations import finalize
+from supply_chain.cube import build_cube, load_cube, save_cube
+from supply_chain.database import connect
+from supply_chain.filters import filter_options
+from supply_chain.incremental import refresh
+from supply_chain.ingest import CACHE_DIR
+
+# Number of published versions kept; older ones are removed once a newer one is live,
+# leaving readers that are still loading the previous version time to finish
+KEEP_VERSIONS = 3
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+
+def publish_root(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / "published" / csv_path.stem
+
+
+def source_state(csv_path):
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def publish(csv_path, materialize=True, keep=KEEP_VERSIONS):
+    # Recompute everything the dashboard reads for the current state of
+    # csv_path into a fresh version directory, then switch the CURRENT pointer
+    # to it atomically. Returns the manifest, or None when the file changed
+    # while computing and the results would not match a single state.
+    state = source_state(csv_path)
+    started = time.perf_counter()
+
+    partials = refresh(csv_path, materialize=materialize)
+    aggregates = finalize(partials)
+    options = filter_options(aggregates)
+    con = connect(csv_path, materialize=materialize)
+    try:
+        cube = build_cube(con)
+    finally:
+        con.close()
+
+    if source_state(csv_path) != state:
+        return None
+
+    root = publish_root(csv_path)
+    name = f"{state[0]}-{state[1]}"
+    staging = root / f".{name}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    # Aggregate keys are column names, so files are numbered and the manifest maps them back
+    files = {}
+    for index, (key, frame) in enumerate(aggregates.items()):
+        files[key] = f"aggregates_{index}.parquet"
+        frame.to_parquet(staging / files[key], index=False)
+    (staging / "filter_options.json").write_text(json.dumps(options))
+    save_cube(cube, staging / "cube.parquet")
+
+    manifest = {
+        "version": name,
+        "mtime_ns": state[0],
+        "size": state[1],
+        "published_at": time.time(),
+        "seconds": time.perf_counter() - started,
+        "aggregates": files,
+    }
+    (staging / MANIFEST).write_text(json.dumps(manifest))
+
+    target = root / name
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    pointer = root / f"{CURRENT}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / CURRENT)
+
+    _prune(root, name, keep)
+    manifest["path"] = str(target)
+    return manifest
+
+
+def _prune(root, current, keep):
+    versions = sorted(
+        (path for path in root.iterdir() if path.is_dir() and not path.name.startswith(".")),
+        key=lambda path: path.stat().st_mtime_ns,
+    )
+    for path in versions[:-keep]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_published(csv_path):
+    # Manifest of the live published version for csv_path, with its directory
+    # and whether the source has changed since; None when nothing is published
+    root = publish_root(csv_path)
+    try:
+        name = (root / CURRENT).read_text().strip()
+        manifest = json.loads((root / name / MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
+    manifest["path"] = str(root / name)
+    manifest["stale"] = (manifest["mtime_ns"], manifest["size"]) != source_state(csv_path)
+    return manifest
+
+
+def published_aggregates(manifest):
+    path = Path(manifest["path"])
+    return {key: pd.read_parquet(path / file) for key, file in manifest["aggregates"].items()}
+
+
+def published_filter_options(manifest):
+    return json.loads((Path(manifest["path"]) / "filter_options.json").read_text())
+
+
+def published_cube(manifest):
+    return load_cube(Path(manifest["path"]) / "cube.parquet")
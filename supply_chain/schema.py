@@ -0,0 +1,34 @@
+# Column layout of supply_chain_data.csv, in file order, with the DuckDB type
+# each column is stored as
+COLUMN_TYPES = {
+    "Product type": "VARCHAR",
+    "SKU": "VARCHAR",
+    "Price": "DOUBLE",
+    "Availability": "INTEGER",
+    "Number of products sold": "INTEGER",
+    "Revenue generated": "DOUBLE",
+    "Customer demographics": "VARCHAR",
+    "Stock levels": "INTEGER",
+    "Lead times": "INTEGER",
+    "Order quantities": "INTEGER",
+    "Shipping times": "INTEGER",
+    "Shipping carriers": "VARCHAR",
+    "Shipping costs": "DOUBLE",
+    "Supplier name": "VARCHAR",
+    "Location": "VARCHAR",
+    "Lead time": "INTEGER",
+    "Production volumes": "INTEGER",
+    "Manufacturing lead time": "INTEGER",
+    "Manufacturing costs": "DOUBLE",
+    "Inspection results": "VARCHAR",
+    "Defect rates": "DOUBLE",
+    "Transportation modes": "VARCHAR",
+    "Routes": "VARCHAR",
+    "Costs": "DOUBLE",
+}
+
+COLUMNS = list(COLUMN_TYPES)
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
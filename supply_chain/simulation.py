@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from supply_chain.database import TABLE, query
+from supply_chain.schema import quote
+
+# Per-SKU inputs of the replenishment model
+SIMULATION_COLUMNS = ["Product type", "SKU", "Stock levels", "Number of products sold",
+                      "Lead times", "Manufacturing lead time"]
+
+# 'Number of products sold' is read as sales over this many days
+DEMAND_PERIOD_DAYS = 365
+
+# Coefficient of variation of supplier and manufacturing lead times
+LEAD_TIME_CV = 0.25
+
+SCENARIOS = 10_000
+SERVICE_LEVEL = 0.95
+SEED = 0
+
+# SKUs simulated per task; a block of SKUs times all scenarios is held in memory at once
+BLOCK_SKUS = 2_000
+
+
+def load_inputs(con, where="", params=None):
+    columns = ", ".join(quote(name) for name in SIMULATION_COLUMNS)
+    return query(con, f"SELECT {columns} FROM {TABLE} {where}", params)
+
+
+def draw_scenarios(scenarios, seed=SEED):
+    # Per-scenario random factors shared by every SKU: unit-mean gamma
+    # multipliers of the supplier and manufacturing lead times and a standard
+    # normal demand shock. Sharing them (common random numbers) leaves each
+    # SKU's distribution unchanged and makes a SKU's outcome in a scenario
+    # plain arithmetic on its own parameters.
+    rng = np.random.default_rng(seed)
+    shape = 1 / LEAD_TIME_CV ** 2
+    lead = rng.standard_gamma(shape, size=scenarios, dtype=np.float32) / shape
+    manufacturing = rng.standard_gamma(shape, size=scenarios, dtype=np.float32) / shape
+    shock = rng.standard_normal(size=scenarios, dtype=np.float32)
+    return lead, manufacturing, shock
+
+
+def _simulate_block(stock, rate, lead, manufacturing, draws, service_level):
+    # Demand over the replenishment lead time for a block of SKUs in every
+    # scenario, as one (SKUs, scenarios) float32 array. Given the lead time,
+    # demand is approximated as normal with the Poisson mean and variance,
+    # rounded to whole units.
+    lead_draws, manufacturing_draws, shock = draws
+    demand = (rate * lead)[:, None] * lead_draws + (rate * manufacturing)[:, None] * manufacturing_draws
+    noise = np.sqrt(demand)
+    noise *= shock
+    demand += noise
+    np.rint(demand, out=demand)
+    np.maximum(demand, 0, out=demand)
+
+    stockout = (demand > stock[:, None]).mean(axis=1)
+    # Smallest simulated demand covering service_level of the scenarios
+    k = max(int(np.ceil(service_level * demand.shape[1])) - 1, 0)
+    reorder_point = np.partition(demand, k, axis=1)[:, k]
+    expected = demand.mean(axis=1)
+    return stockout, reorder_point, expected
+
+
+def simulate(inputs, scenarios=SCENARIOS, service_level=SERVICE_LEVEL, seed=SEED,
+             block_skus=BLOCK_SKUS, workers=None, pool=None):
+    # Stock-out probability over one replenishment cycle and the stock needed
+    # to meet service_level, per SKU. Blocks of SKUs are simulated across a
+    # process pool (pool when given, else one started for this call) against
+    # the same scenario draws, so results do not depend on the block size or
+    # the number of workers.
+    stock = inputs["Stock levels"].to_numpy(dtype=np.float32)
+    rate = inputs["Number of products sold"].to_numpy(dtype=np.float32) / DEMAND_PERIOD_DAYS
+    lead = inputs["Lead times"].to_numpy(dtype=np.float32)
+    manufacturing = inputs["Manufacturing lead time"].to_numpy(dtype=np.float32)
+    draws = draw_scenarios(scenarios, seed)
+
+    starts = range(0, len(inputs), block_skus)
+    tasks = [
+        (stock[start:start + block_skus], rate[start:start + block_skus], lead[start:start + block_skus],
+         manufacturing[start:start + block_skus], draws, service_level)
+        for start in starts
+    ]
+    workers = min(workers or os.cpu_count(), len(tasks))
+    if workers <= 1:
+        results = [_simulate_block(*task) for task in tasks]
+    elif pool is not None:
+        results = list(pool.map(_simulate_block, *zip(*tasks)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_block, *zip(*tasks)))
+
+    if results:
+        stockout, reorder_point, expected = (np.concatenate(parts) for parts in zip(*results))
+    else:
+        stockout = reorder_point = expected = np.empty(0)
+
+    result = inputs[["Product type", "SKU", "Stock levels"]].copy()
+    result["Stock-out probability"] = stockout
+    result["Expected lead-time demand"] = expected
+    result["Reorder point"] = reorder_point
+    result["Safety stock"] = np.maximum(reorder_point - expected, 0)
+    result["Additional stock needed"] = np.maximum(reorder_point - stock, 0)
+    return result
+
+
+def summarize_by_product(result):
+    # Per product type: mean SKU stock-out probability, expected SKUs out of
+    # stock and total recommended safety and additional stock
+    grouped = result.groupby("Product type", observed=True)
+    return pd.DataFrame({
+        "SKUs": grouped.size(),
+        "Stock-out probability": grouped["Stock-out probability"].mean(),
+        "Expected SKUs out of stock": grouped["Stock-out probability"].sum(),
+        "Safety stock": grouped["Safety stock"].sum(),
+        "Additional stock needed": grouped["Additional stock needed"].sum(),
+    }).reset_index()
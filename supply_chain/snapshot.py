@@ -0,0 +1,44 @@
+import json
+import os
+from pathlib import Path
+
+# Deliberately free of heavy imports: the dashboard reads the snapshot to paint
+# its header and KPI cards before pandas, DuckDB or Plotly are loaded
+
+CACHE_DIR = ".cache"
+
+# Totals kept in the snapshot for the first paint
+SNAPSHOT_MEASURES = ["Revenue generated", "Order quantities", "Availability", "Stock levels", "Lead times"]
+
+
+def snapshot_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.parent / CACHE_DIR / f"{csv_path.stem}.snapshot.json"
+
+
+def write_snapshot(csv_path, totals, rows):
+    # Record the KPI totals computed at ingest time, with the source state they match
+    stat = os.stat(csv_path)
+    snapshot = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "rows": int(rows),
+        "totals": {name: float(totals[name]) for name in SNAPSHOT_MEASURES},
+    }
+    path = snapshot_path(csv_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging_path = path.with_suffix(".tmp")
+    staging_path.write_text(json.dumps(snapshot))
+    os.replace(staging_path, path)
+
+
+def read_snapshot(csv_path):
+    # The last snapshot written for csv_path, flagged stale when the source
+    # has changed since; None when there is none yet
+    path = snapshot_path(csv_path)
+    if not path.exists():
+        return None
+    snapshot = json.loads(path.read_text())
+    stat = os.stat(csv_path)
+    snapshot["stale"] = (snapshot["mtime_ns"], snapshot["size"]) != (stat.st_mtime_ns, stat.st_size)
+    return snapshot
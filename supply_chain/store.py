@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+# Memory budget for results shared across sessions; least recently used entries are evicted past it
+MAX_BYTES = int(os.environ.get("SUPPLY_CHAIN_STORE_BYTES", 512 * 1024 ** 2))
+
+
+def size_of(value):
+    # Approximate in-memory footprint of a stored result
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class SharedStore:
+    # Process-wide store of computed results shared by every session. Results are
+    # handed out by reference, not copied, so callers must treat them as read-only.
+    # Concurrent requests for a missing key wait on a single computation.
+    # Entries past max_bytes or max_entries are evicted least recently used
+    # first, or oldest first without lru, and passed to on_evict.
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=None, on_evict=None, lru=True):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.lru = lru
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._bytes = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.lru:
+                    self._entries.move_to_end(key)
+                return entry[0]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+
+        nbytes = size_of(value)
+        evicted = []
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            # The newest entry is always kept, even when it alone exceeds the budget
+            while len(self._entries) > 1 and (
+                self._bytes > self.max_bytes
+                or (self.max_entries is not None and len(self._entries) > self.max_entries)
+            ):
+                _, (old_value, old_bytes) = self._entries.popitem(last=False)
+                self._bytes -= old_bytes
+                evicted.append(old_value)
+        future.set_result(value)
+        if self.on_evict is not None:
+            for old_value in evicted:
+                self.on_evict(old_value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "pending": len(self._pending)}
@@ -0,0 +1,19 @@
+import duckdb
+
+from supply_chain.aggregations import compute_partials, merge_partials
+from supply_chain.ingest import read_csv
+
+# Rows parsed per chunk; peak memory scales with this, not with the file size
+CHUNK_ROWS = 500_000
+
+
+def stream_partials(csv_path, chunk_rows=CHUNK_ROWS):
+    # Read the CSV in bounded chunks and fold each chunk into the running
+    # per-group sums and counts, so only one chunk is ever held in memory
+    con = duckdb.connect()
+    partials = None
+    for chunk in read_csv(csv_path, chunksize=chunk_rows):
+        chunk_partials = compute_partials(chunk, con)
+        partials = chunk_partials if partials is None else merge_partials(partials, chunk_partials)
+    con.close()
+    return partials
@@ -0,0 +1,96 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from supply_chain.ingest import read_csv
+from supply_chain.schema import COLUMN_TYPES
+
+# Points of the empirical quantile function kept per numeric column
+QUANTILES = 101
+
+# Rows generated and written per part file
+CHUNK_ROWS = 1_000_000
+
+
+def fit_profile(csv_path):
+    # Learn category frequencies and the empirical distribution of every
+    # numeric column of csv_path
+    df = read_csv(csv_path)
+    profile = {}
+    for name, kind in COLUMN_TYPES.items():
+        if name == "SKU":
+            continue
+        if kind == "VARCHAR":
+            frequencies = df[name].astype(str).value_counts(normalize=True)
+            profile[name] = {"kind": "categorical", "values": frequencies.index.tolist(),
+                             "probabilities": frequencies.to_numpy().tolist()}
+        else:
+            values = df[name].dropna().to_numpy(dtype=float)
+            profile[name] = {"kind": kind.lower(),
+                             "quantiles": np.quantile(values, np.linspace(0, 1, QUANTILES)).tolist()}
+    return profile
+
+
+def generate_frame(profile, rows, seed=0, start=0):
+    # Rows with the schema of supply_chain_data.csv. Categories are drawn with
+    # their observed frequencies, numbers by inverse-CDF sampling of the
+    # observed quantiles; SKUs are numbered from start.
+    rng = np.random.default_rng(seed)
+    grid = np.linspace(0, 1, QUANTILES)
+    columns = {}
+    for name in COLUMN_TYPES:
+        if name == "SKU":
+            columns[name] = "SKU" + pd.Series(np.arange(start, start + rows)).astype(str)
+            continue
+        spec = profile[name]
+        if spec["kind"] == "categorical":
+            codes = rng.choice(len(spec["values"]), size=rows, p=spec["probabilities"])
+            columns[name] = pd.Categorical.from_codes(codes, categories=spec["values"])
+        else:
+            values = np.interp(rng.random(rows), grid, spec["quantiles"])
+            columns[name] = np.rint(values).astype(np.int32) if spec["kind"] == "integer" else values
+    return pd.DataFrame(columns)
+
+
+def _write_part(profile, path, rows, seed, start, header):
+    frame = generate_frame(profile, rows, seed, start)
+    if path.suffix == ".parquet":
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    else:
+        frame.to_csv(path, header=header, index=False)
+    return path
+
+
+def write_parts(profile, out_dir, rows, fmt="parquet", chunk_rows=CHUNK_ROWS, workers=None, seed=0):
+    # Generate rows as numbered part files, one chunk per task across a
+    # process pool; CSV parts after the first have no header so they can be
+    # concatenated into one file
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    starts = list(range(0, rows, chunk_rows))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_write_part, profile, out_dir / f"part-{index:05d}.{fmt}",
+                        min(chunk_rows, rows - start), seed + index, start, index == 0)
+            for index, start in enumerate(starts)
+        ]
+        return [future.result() for future in futures]
+
+
+def write_csv(profile, path, rows, chunk_rows=CHUNK_ROWS, workers=None, seed=0):
+    # Generate a single CSV: parts are written in parallel, then concatenated
+    path = Path(path)
+    parts_dir = path.with_name(path.name + ".parts")
+    parts = write_parts(profile, parts_dir, rows, "csv", chunk_rows, workers, seed)
+    with open(path, "wb") as output:
+        for part in parts:
+            with open(part, "rb") as handle:
+                shutil.copyfileobj(handle, output, 16 * 1024 * 1024)
+    shutil.rmtree(parts_dir)
+    return path
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from supply_chain.ingest import CACHE_DIR
+
+TARGET = "Revenue generated"
+DROP_COLUMNS = ["SKU", TARGET]
+
+# Forest size, depth and feature subsampling explored by the search
+PARAM_GRID = {
+    "n_estimators": [100, 200, 400],
+    "max_depth": [None, 10, 20],
+    "max_features": [1.0, "sqrt", 0.5],
+}
+
+
+def split_features(df):
+    # Features, target and the column kinds the preprocessor needs
+    features = df.drop(columns=DROP_COLUMNS)
+    categorical_cols = features.select_dtypes(include=["object", "string", "category"]).columns.tolist()
+    numerical_cols = features.select_dtypes(include=["number"]).columns.tolist()
+    return features, df[TARGET], categorical_cols, numerical_cols
+
+
+def build_preprocessor(categorical_cols, numerical_cols):
+    # Preprocessing for numerical and categorical data
+    numerical_transformer = SimpleImputer(strategy="mean")
+    categorical_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+    ])
+
+    return ColumnTransformer(
+        transformers=[
+            ("num", numerical_transformer, numerical_cols),
+            ("cat", categorical_transformer, categorical_cols)
+        ])
+
+
+def frame_digest(*frames, extra=""):
+    # Content hash of the training data plus any config it was prepared with
+    digest = hashlib.sha256(extra.encode())
+    for frame in frames:
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame()
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _prune(cache_dir, prefix, key):
+    # Remove cached files of other data versions, so the cache holds one set
+    for path in Path(cache_dir).glob(f"{prefix}-*"):
+        if not path.name.startswith(f"{prefix}-{key}"):
+            path.unlink(missing_ok=True)
+
+
+def prepare_folds(X, y, preprocessor, n_splits=5, cache_dir=CACHE_DIR):
+    # Fit the preprocessor once per fold and keep the encoded matrices on disk,
+    # so candidates reuse them instead of refitting the ColumnTransformer
+    key = frame_digest(X, y, extra=f"{preprocessor!r}|{n_splits}")
+    path = Path(cache_dir) / f"folds-{key[:16]}.joblib"
+    if path.exists():
+        return path
+
+    folds = []
+    for train_index, test_index in KFold(n_splits=n_splits, shuffle=True, random_state=42).split(X):
+        fold_preprocessor = clone(preprocessor)
+        X_fold_train = fold_preprocessor.fit_transform(X.iloc[train_index])
+        X_fold_test = fold_preprocessor.transform(X.iloc[test_index])
+        folds.append((X_fold_train, y.iloc[train_index].to_numpy(), X_fold_test, y.iloc[test_index].to_numpy()))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging_path = path.with_suffix(".tmp")
+    joblib.dump(folds, staging_path)
+    os.replace(staging_path, path)
+    _prune(cache_dir, "folds", key[:16])
+    return path
+
+
+def encode_cached(preprocessor, X, cache_dir=CACHE_DIR):
+    # Fit the preprocessor on X and return it with the encoded design matrix,
+    # in the transformer's own output format: the forest splits dense input
+    # much faster, so sparse output is kept only when the transformer chose
+    # it. Both are persisted under a hash of the data and the preprocessor
+    # config, so retraining on unchanged data skips the encoding.
+    key = frame_digest(X, extra=repr(preprocessor))[:16]
+    sparse_path = Path(cache_dir) / f"design-{key}.npz"
+    dense_path = Path(cache_dir) / f"design-{key}.npy"
+    preprocessor_path = Path(cache_dir) / f"design-{key}.preprocessor.joblib"
+    if preprocessor_path.exists():
+        if sparse_path.exists():
+            return joblib.load(preprocessor_path), sp.load_npz(sparse_path)
+        if dense_path.exists():
+            return joblib.load(preprocessor_path), np.load(dense_path)
+
+    fitted = clone(preprocessor)
+    X_encoded = fitted.fit_transform(X)
+
+    preprocessor_path.parent.mkdir(parents=True, exist_ok=True)
+    if sp.issparse(X_encoded):
+        X_encoded = sp.csr_matrix(X_encoded)
+        matrix_path = sparse_path
+        sp.save_npz(matrix_path.with_suffix(".tmp.npz"), X_encoded)
+        os.replace(matrix_path.with_suffix(".tmp.npz"), matrix_path)
+    else:
+        matrix_path = dense_path
+        with open(matrix_path.with_suffix(".tmp"), "wb") as handle:
+            np.save(handle, X_encoded)
+        os.replace(matrix_path.with_suffix(".tmp"), matrix_path)
+    joblib.dump(fitted, preprocessor_path.with_suffix(".tmp"))
+    os.replace(preprocessor_path.with_suffix(".tmp"), preprocessor_path)
+    _prune(cache_dir, "design", key)
+    return fitted, X_encoded
+
+
+def fit_encoded(preprocessor, X_encoded, y, **params):
+    # Fit the forest on an already encoded matrix and assemble the full
+    # pipeline around the fitted preprocessor; returns it with the fit time
+    regressor = RandomForestRegressor(random_state=42, **params)
+    start = time.perf_counter()
+    regressor.fit(X_encoded, y)
+    fit_time = time.perf_counter() - start
+    return Pipeline(steps=[("preprocessor", preprocessor), ("regressor", regressor)]), fit_time
+
+
+_worker_folds = None
+
+
+def _init_worker(folds_path):
+    global _worker_folds
+    _worker_folds = joblib.load(folds_path)
+
+
+def _evaluate(params):
+    # Cross-validate one candidate on the pre-encoded folds
+    r2, mae, fit_time, predict_time = [], [], [], []
+    for X_train, y_train, X_test, y_test in _worker_folds:
+        regressor = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+        start = time.perf_counter()
+        regressor.fit(X_train, y_train)
+        fit_time.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        predictions = regressor.predict(X_test)
+        predict_time.append(time.perf_counter() - start)
+        r2.append(r2_score(y_test, predictions))
+        mae.append(mean_absolute_error(y_test, predictions))
+    return {
+        "params": params,
+        "r2": float(np.mean(r2)),
+        "r2_std": float(np.std(r2)),
+        "mae": float(np.mean(mae)),
+        "fit_time": float(np.mean(fit_time)),
+        "predict_time": float(np.mean(predict_time)),
+    }
+
+
+def _candidate_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def load_checkpoint(checkpoint_path, folds_key=None):
+    # Results recorded for folds_key; records of other data or folds are
+    # ignored, as is a last line cut short by an interrupted write
+    results = {}
+    if Path(checkpoint_path).exists():
+        with open(checkpoint_path) as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if result.get("folds") == folds_key:
+                    results[_candidate_key(result["params"])] = result
+    return results
+
+
+def search(folds_path, checkpoint_path, param_grid=PARAM_GRID, n_jobs=None):
+    # Evaluate every candidate across a process pool, appending each result to
+    # the checkpoint as it finishes; candidates already there for the same
+    # folds are skipped, so an interrupted search resumes where it stopped.
+    # Only candidates of param_grid are returned.
+    folds_key = Path(folds_path).stem
+    candidates = {_candidate_key(params): params for params in ParameterGrid(param_grid)}
+    results = {key: result for key, result in load_checkpoint(checkpoint_path, folds_key).items()
+               if key in candidates}
+    pending = [params for key, params in candidates.items() if key not in results]
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(str(folds_path),)) as pool:
+            futures = [pool.submit(_evaluate, params) for params in pending]
+            with open(checkpoint_path, "a") as checkpoint:
+                # Start on a fresh line after a truncated record
+                if checkpoint.tell() and not Path(checkpoint_path).read_bytes().endswith(b"\n"):
+                    checkpoint.write("\n")
+                for future in as_completed(futures):
+                    result = {**future.result(), "folds": folds_key}
+                    results[_candidate_key(result["params"])] = result
+                    checkpoint.write(json.dumps(result) + "\n")
+                    checkpoint.flush()
+
+    return sorted(results.values(), key=lambda result: result["r2"], reverse=True)
+
+
+def evaluate_model(model, fit_time, X_test, y_test):
+    # Report hold-out metrics and timings for a fitted pipeline
+    start = time.perf_counter()
+    predictions = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+    return {
+        "r2": float(r2_score(y_test, predictions)),
+        "mae": float(mean_absolute_error(y_test, predictions)),
+        "fit_time": fit_time,
+        "predict_time": predict_time,
+    }
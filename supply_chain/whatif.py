@@ -0,0 +1,61 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from supply_chain.database import TABLE, query
+from supply_chain.forest import COMPILED_PATH, compiled_from, export_forest, load_compiled, model_source
+from supply_chain.prediction import MODEL_PATH, PREDICTION, TARGET
+from supply_chain.schema import quote
+
+SCENARIO_PREDICTION = "Scenario revenue"
+
+
+def load_revenue_model(model_path=MODEL_PATH, compiled_path=COMPILED_PATH):
+    # The compiled forest, exported again whenever the trained pipeline differs
+    # from the one it was compiled from
+    if not compiled_from(compiled_path, model_path):
+        export_forest(joblib.load(model_path), compiled_path, model_source(model_path))
+    return load_compiled(compiled_path)
+
+
+def load_base(con, model, where="", params=None):
+    # SKU rows in scope with their encoded design matrix and predicted revenue,
+    # the starting point every scenario is derived from. The matrix is
+    # read-only; scenarios work on a copy.
+    columns = ["SKU", TARGET] + [name for name in model.feature_names_in_ if name != TARGET]
+    rows = query(con, f"SELECT {', '.join(quote(name) for name in columns)} FROM {TABLE} {where}", params)
+    encoded = model.encode(rows)
+    encoded.flags.writeable = False
+    return {"rows": rows, "encoded": encoded, "predicted": model.predict_encoded(encoded)}
+
+
+def run_scenario(model, base, price_change=0.0, quantity_change=0.0, carrier=None, mode=None):
+    # Predicted revenue per SKU after scaling Price and Order quantities by
+    # the given fractions and moving every SKU to carrier and mode (None keeps
+    # the current one). Only the changed columns of the base encoding are
+    # rewritten before the forest is evaluated.
+    start = time.perf_counter()
+    encoded = base["encoded"].copy()
+    if price_change:
+        encoded[:, model.column_index("Price")] *= 1 + price_change
+    if quantity_change:
+        encoded[:, model.column_index("Order quantities")] *= 1 + quantity_change
+
+    overrides = {name: value for name, value in (("Shipping carriers", carrier), ("Transportation modes", mode))
+                 if value is not None}
+    if overrides:
+        constant = pd.DataFrame({name: np.full(len(encoded), value, dtype=object) for name, value in overrides.items()})
+        model.encode_categorical(constant, encoded, columns=overrides)
+
+    rows = base["rows"]
+    result = pd.DataFrame({
+        "SKU": rows["SKU"],
+        "Product type": rows["Product type"],
+        TARGET: rows[TARGET],
+        PREDICTION: base["predicted"],
+        SCENARIO_PREDICTION: model.predict_encoded(encoded),
+    })
+    result["Change"] = result[SCENARIO_PREDICTION] - result[PREDICTION]
+    return result, time.perf_counter() - start
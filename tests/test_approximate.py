@@ -0,0 +1,31 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from supply_chain.aggregations import TOTAL, finalize
+from supply_chain.approximate import estimate_totals
+from supply_chain.incremental import read_sample, refresh
+
+DATA = Path(__file__).resolve().parent.parent / "supply_chain_data.csv"
+
+
+def test_estimates_from_parquet_rebuilt_sample(tmp_path):
+    # A full rebuild reads the sample from the Parquet cache, whose integer
+    # measures are downcast to int8; squaring them must not overflow
+    csv_path = tmp_path / "data.csv"
+    shutil.copy(DATA, csv_path)
+    partials = refresh(csv_path)
+    sample, rows = read_sample(csv_path)
+    assert sample["Order quantities"].dtype == "int8"
+
+    estimates = estimate_totals(sample, rows)
+
+    # The sample holds every row of the small dataset, so the estimates are exact
+    totals = finalize(partials)[TOTAL].iloc[0]
+    exact = pd.read_csv(DATA)
+    assert estimates["rate"] == 1.0
+    assert estimates["distinct_skus"] == exact["SKU"].nunique()
+    for name in ["Revenue generated", "Order quantities", "Stock levels", "Lead times"]:
+        assert abs(estimates["totals"][name] - totals[name]) < 1e-6 * abs(totals[name])
+        assert estimates["totals"][f"{name} low"] == estimates["totals"][f"{name} high"]
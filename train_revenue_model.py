@@ -1,45 +1,64 @@
+import argparse
+import json
 
-import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.impute import SimpleImputer
 import joblib
+from supply_chain.forest import COMPILED_PATH, export_forest, model_source
+from supply_chain.ingest import load_frame
+from supply_chain.training import (
+    build_preprocessor,
+    encode_cached,
+    evaluate_model,
+    fit_encoded,
+    prepare_folds,
+    search,
+    split_features,
+)
 
-# Load the dataset
-df = pd.read_csv("supply_chain_data.csv")
+def main():
+    parser = argparse.ArgumentParser(description="Train the revenue prediction model.")
+    parser.add_argument("--search", action="store_true",
+                        help="cross-validate a grid of forest settings and keep the best one")
+    parser.add_argument("--n-jobs", type=int, default=None, help="worker processes for the search")
+    parser.add_argument("--checkpoint", default="revenue_model_search.jsonl",
+                        help="search results file; an interrupted search resumes from it")
+    parser.add_argument("--report", default="revenue_model_metrics.json", help="metrics report written by --search")
+    args = parser.parse_args()
 
-# Drop columns that are not useful for prediction
-df_clean = df.drop(columns=["SKU", "Revenue generated"])
+    # Load the dataset through its columnar cache
+    df = load_frame("supply_chain_data.csv")
 
-# Target variable
-y = df["Revenue generated"]
+    # Drop columns that are not useful for prediction and split off the target
+    df_clean, y, categorical_cols, numerical_cols = split_features(df)
 
-categorical_cols = df_clean.select_dtypes(include=["object"]).columns.tolist()
-numerical_cols = df_clean.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    preprocessor = build_preprocessor(categorical_cols, numerical_cols)
 
-# Preprocessing for numerical and categorical data
-numerical_transformer = SimpleImputer(strategy="mean")
-categorical_transformer = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="most_frequent")),
-    ("onehot", OneHotEncoder(handle_unknown="ignore"))
-])
+    X_train, X_test, y_train, y_test = train_test_split(df_clean, y, test_size=0.2, random_state=42)
 
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("num", numerical_transformer, numerical_cols),
-        ("cat", categorical_transformer, categorical_cols)
-    ])
+    # Encoded design matrix of the training split, reused across runs while the data is unchanged
+    fitted_preprocessor, X_train_encoded = encode_cached(preprocessor, X_train)
 
-model = Pipeline(steps=[
-    ("preprocessor", preprocessor),
-    ("regressor", RandomForestRegressor(random_state=42))
-])
+    if args.search:
+        # Cross-validated search on the training split, then a hold-out evaluation of the winner
+        folds_path = prepare_folds(X_train, y_train, preprocessor)
+        results = search(folds_path, args.checkpoint, n_jobs=args.n_jobs)
+        best = results[0]
 
-X_train, X_test, y_train, y_test = train_test_split(df_clean, y, test_size=0.2, random_state=42)
+        model, fit_time = fit_encoded(fitted_preprocessor, X_train_encoded, y_train, **best["params"])
+        holdout = evaluate_model(model, fit_time, X_test, y_test)
 
-model.fit(X_train, y_train)
+        with open(args.report, "w") as report:
+            json.dump({"best_params": best["params"], "cross_validation": best, "holdout": holdout,
+                       "candidates": results}, report, indent=2)
+        print(f"Best {best['params']}: CV R2 {best['r2']:.3f}, hold-out R2 {holdout['r2']:.3f}, MAE {holdout['mae']:.2f}")
+    else:
+        model, _ = fit_encoded(fitted_preprocessor, X_train_encoded, y_train)
 
-joblib.dump(model, "revenue_prediction_model.joblib")
+    joblib.dump(model, "revenue_prediction_model.joblib")
+    # Array-backed copy of the same model for fast loading and batched inference
+    export_forest(model, COMPILED_PATH, model_source("revenue_prediction_model.joblib"))
+
+
+# The search runs in a process pool; spawned workers re-import this module
+if __name__ == "__main__":
+    main()